@@ -4,31 +4,122 @@ eGauge Power Monitor Analysis Script
 Analyzes power consumption and solar production data from eGauge device
 """
 
+import os
+import re
+import sys
+import time
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
+import lxml.etree as LET
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime, timedelta
-import seaborn as sns
+from dateutil import tz
 from typing import Dict, List, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import numba
+except ImportError:  # Optional: falls back to the NumPy implementations below
+    numba = None
+
 # Configuration
 EGAUGE_IP = "10.10.20.241"
 BASE_URL = f"http://{EGAUGE_IP}/cgi-bin/egauge-show"
 
-# Set style for better-looking plots
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+# Concurrent requests used by the instant-reading fallback
+INSTANT_FETCH_WORKERS = 16
+
+# Local timezone used to turn eGauge epoch timestamps into wall-clock times
+LOCAL_TZ = tz.gettz()
+
+# Cached historical data younger than this (seconds) is reused instead of refetched
+CACHE_MAX_AGE = 3600
+
+# Without a terminal (or, on Linux, without an X or Wayland display) there is
+# nobody to show the figure to, so render off-screen
+HEADLESS = not (sys.stdout.isatty() and (
+    not sys.platform.startswith('linux')
+    or bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))))
+
+def to_local_index(epoch_seconds: np.ndarray) -> pd.DatetimeIndex:
+    """
+    Vectorized equivalent of datetime.fromtimestamp over an array of epoch seconds
+    """
+    return pd.to_datetime(epoch_seconds, unit='s', utc=True).tz_convert(LOCAL_TZ).tz_localize(None)
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def pivot_hour_dow(grid, hour, dow):
+        """
+        Mean grid value per (day of week, hour) cell as a 7x24 array, NaN where empty
+        """
+        sums = np.zeros((7, 24))
+        counts = np.zeros((7, 24), np.int64)
+        for i in range(grid.size):
+            value = grid[i]
+            if not np.isnan(value):
+                sums[dow[i], hour[i]] += value
+                counts[dow[i], hour[i]] += 1
+
+        pivot = np.full((7, 24), np.nan)
+        for d in range(7):
+            for h in range(24):
+                if counts[d, h] > 0:
+                    pivot[d, h] = sums[d, h] / counts[d, h]
+        return pivot
+else:
+    def pivot_hour_dow(grid, hour, dow):
+        """
+        Mean grid value per (day of week, hour) cell as a 7x24 array, NaN where empty
+        """
+        valid = ~np.isnan(grid)
+        cell = dow[valid] * 24 + hour[valid]
+        sums = np.bincount(cell, weights=grid[valid], minlength=7 * 24)
+        counts = np.bincount(cell, minlength=7 * 24)
+
+        pivot = np.full(7 * 24, np.nan)
+        np.divide(sums, counts, out=pivot, where=counts > 0)
+        return pivot.reshape(7, 24)
 
 class EGaugeAnalyzer:
     def __init__(self, ip_address: str):
         self.ip = ip_address
         self.base_url = f"http://{ip_address}/cgi-bin/egauge-show"
 
+        # Keep-alive connections reused by every request to the device; the pool
+        # is large enough for the concurrent instant-reading fallback. Only failed
+        # connects are retried: retrying read timeouts would multiply each timeout
+        self._session = requests.Session()
+        retry = Retry(total=3, connect=3, read=0, backoff_factor=0.5)
+        self._session.mount('http://', HTTPAdapter(pool_connections=4,
+                                                   pool_maxsize=INSTANT_FETCH_WORKERS,
+                                                   max_retries=retry))
+
+    def close(self):
+        """
+        Close the HTTP session and its pooled connections
+        """
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def cache_path(self, days_back: int) -> str:
+        """
+        Parquet cache file for a fetch, keyed by device and period
+        """
+        device = re.sub(r'[^\w.-]', '_', self.ip)
+        return f'egauge_cache_{device}_{days_back}d.parquet'
+
     def fetch_historical_data(self, days_back: int = 365) -> pd.DataFrame:
         """
         Fetch historical data from eGauge for specified number of days
@@ -39,6 +130,21 @@ class EGaugeAnalyzer:
         end_time = int(datetime.now().timestamp())
         start_time = int((datetime.now() - timedelta(days=days_back)).timestamp())
 
+        # Reuse data cached by an earlier run within the last hour; a newer
+        # fetch overwrites the same file, so old copies never pile up
+        cache_path = self.cache_path(days_back)
+        try:
+            cache_fresh = time.time() - os.path.getmtime(cache_path) < CACHE_MAX_AGE
+        except OSError:
+            cache_fresh = False
+        if cache_fresh:
+            try:
+                df = pd.read_parquet(cache_path, engine='pyarrow')
+                print(f"Loaded {len(df)} data points from {cache_path}")
+                return df
+            except Exception as e:
+                print(f"Ignoring unreadable cache {cache_path}: {e}")
+
         # For one year of data, use appropriate granularity (hourly data)
         # eGauge supports different time intervals: S (second), m (minute), h (hour), d (day)
         params = {
@@ -53,51 +159,84 @@ class EGaugeAnalyzer:
         url = f"{self.base_url}?h&n={params['n']}&f={params['f']}"
 
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            # Parse XML response
-            root = ET.fromstring(response.content)
+            with self._session.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                # Let urllib3 undo any gzip transfer encoding as lxml reads the socket
+                response.raw.decode_content = True
+
+                # Parse rows as they arrive off the socket, releasing each once it is read.
+                # Values go straight into a preallocated (rows x registers) array.
+                n_rows = params['n']
+                registers = {}
+                data = None
+                ts = np.empty(n_rows, dtype=np.int64)
+                i = 0
+
+                context = LET.iterparse(response.raw, events=('end',), tag=('cname', 'r'))
+                for _, elem in context:
+                    if elem.tag == 'cname':
+                        # Register names and ids
+                        registers[elem.get('t')] = elem.text
+                        continue
+
+                    if data is None:
+                        # All cname elements precede the first row
+                        reg_order = list(registers)
+                        pos = {reg_id: p for p, reg_id in enumerate(reg_order)}
+                        data = np.full((n_rows, len(reg_order)), np.nan)
+                    if i == n_rows:
+                        break
+
+                    ts[i] = int(elem.findtext('t'))
+
+                    for col in elem.iterchildren('c'):
+                        p = pos.get(col.get('r'))
+                        if p is not None:
+                            # Convert from Wh to kWh
+                            data[i, p] = float(col.text) * 1e-3 if col.text else 0
+                    i += 1
+
+                    # Free the row and any already-processed siblings
+                    elem.clear(keep_tail=True)
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+
+            df = pd.DataFrame()
+            if i > 0:
+                ts, data = ts[:i], data[:i]
+                # eGauge lists rows newest first: flipping the views is enough to
+                # get chronological order, with a full sort only if that fails
+                if ts[0] > ts[-1]:
+                    ts, data = ts[::-1], data[::-1]
+                if np.any(ts[1:] < ts[:-1]):
+                    order = np.argsort(ts, kind='stable')
+                    ts, data = ts[order], data[order]
+
+                cols = dict(zip([registers[r] for r in reg_order], data.T))
+
+                # Calculate net values on the raw arrays, before the frame exists
+                if 'Grid+' in cols and 'Grid' in cols:
+                    cols['Grid_Net'] = cols['Grid'] - cols['Grid+']
+
+                if 'Solar+' in cols and 'Solar' in cols:
+                    cols['Solar_Net'] = cols['Solar+'] - cols['Solar']
+
+                df = pd.DataFrame(cols, index=to_local_index(ts).rename('timestamp'))
 
-            # Extract data
-            data_points = []
-
-            # Get register names and units
-            registers = {}
-            for reg in root.findall('.//cname'):
-                reg_id = reg.get('t')
-                reg_name = reg.text
-                registers[reg_id] = reg_name
-
-            # Process each data row
-            for row in root.findall('.//r'):
-                timestamp = int(row.find('t').text)
-                dt = datetime.fromtimestamp(timestamp)
-
-                row_data = {'timestamp': dt}
-
-                for col in row.findall('c'):
-                    col_id = col.get('r')
-                    if col_id in registers:
-                        # Convert from Wh to kWh
-                        value = float(col.text) / 1000.0 if col.text else 0
-                        row_data[registers[col_id]] = value
-
-                data_points.append(row_data)
-
-            df = pd.DataFrame(data_points)
             if not df.empty:
-                df = df.set_index('timestamp')
-                df = df.sort_index()
+                # Readings carry far fewer significant digits than float64 holds
+                float_cols = df.select_dtypes('float64').columns
+                df[float_cols] = df[float_cols].astype(np.float32)
 
-                # Calculate net values
-                if 'Grid+' in df.columns and 'Grid' in df.columns:
-                    df['Grid_Net'] = df['Grid'] - df['Grid+']
+                print(f"Successfully fetched {len(df)} data points")
 
-                if 'Solar+' in df.columns and 'Solar' in df.columns:
-                    df['Solar_Net'] = df['Solar+'] - df['Solar']
+                try:
+                    df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+                except ImportError:
+                    pass  # pyarrow is optional; run without the cache
+                except Exception as e:
+                    print(f"Could not write cache {cache_path}: {e}")
 
-                print(f"Successfully fetched {len(df)} data points")
                 return df
             else:
                 print("No data received from eGauge")
@@ -113,43 +252,53 @@ class EGaugeAnalyzer:
         Alternative method to fetch data using instant readings
         """
         print("Trying alternative data fetch method...")
-        data_points = []
 
         # Sample data points (every 6 hours for the last year)
         sample_interval_hours = 6
         total_samples = (days_back * 24) // sample_interval_hours
+        now = datetime.now()
+        tasks = [(i, now - timedelta(hours=i * sample_interval_hours))
+                 for i in range(0, min(total_samples, 1460))]  # Limit to avoid too many requests
 
-        for i in range(0, min(total_samples, 1460)):  # Limit to avoid too many requests
-            hours_ago = i * sample_interval_hours
-            timestamp = datetime.now() - timedelta(hours=hours_ago)
+        url = f"http://{self.ip}/cgi-bin/egauge?inst"
 
+        def fetch_one(task):
+            i, timestamp = task
             try:
-                url = f"http://{self.ip}/cgi-bin/egauge?inst"
-                response = requests.get(url, timeout=5)
+                response = self._session.get(url, timeout=5)
+                if response.status_code != 200:
+                    return None
+
+                root = ET.fromstring(response.content)
 
-                if response.status_code == 200:
-                    root = ET.fromstring(response.content)
+                row_data = {}
+                for reg in root.findall('.//r'):
+                    name = reg.get('n')
+                    power_element = reg.find('i')
+                    if power_element is not None:
+                        power = float(power_element.text) / 1000.0  # Convert to kW
+                        row_data[name] = power
 
-                    row_data = {'timestamp': timestamp}
+                return timestamp, row_data
 
-                    for reg in root.findall('.//r'):
-                        name = reg.get('n')
-                        power_element = reg.find('i')
-                        if power_element is not None:
-                            power = float(power_element.text) / 1000.0  # Convert to kW
-                            row_data[name] = power
+            except Exception as e:
+                return None
 
-                    data_points.append(row_data)
+        timestamps = []
+        rows = []
+        with ThreadPoolExecutor(max_workers=INSTANT_FETCH_WORKERS) as executor:
+            for (i, _), result in zip(tasks, executor.map(fetch_one, tasks)):
+                if result is None:
+                    continue
 
-                    if i % 100 == 0:
-                        print(f"Fetched {i}/{total_samples} samples...")
+                timestamps.append(result[0])
+                rows.append(result[1])
 
-            except Exception as e:
-                continue
+                if i % 100 == 0:
+                    print(f"Fetched {i}/{total_samples} samples...")
 
-        df = pd.DataFrame(data_points)
+        df = pd.DataFrame(rows, index=pd.DatetimeIndex(timestamps, name='timestamp'))
         if not df.empty:
-            df = df.set_index('timestamp')
             df = df.sort_index()
 
         return df
@@ -163,26 +312,22 @@ class EGaugeAnalyzer:
         if df.empty:
             return {}
 
-        # Resample to daily for calculations
-        daily_df = df.resample('D').mean()
-
-        # Calculate monthly statistics
-        monthly_stats = {}
-
-        for col in df.columns:
-            if 'Grid' in col or 'Solar' in col:
-                monthly = df[col].resample('M').agg(['mean', 'sum', 'max', 'min'])
-                monthly_stats[col] = monthly
+        # Calculate monthly statistics for every power column in one resample pass
+        power_cols = [c for c in df.columns if 'Grid' in c or 'Solar' in c]
+        if not power_cols:
+            return {}
 
-        # Create monthly summary
-        summary = pd.DataFrame()
+        stats = df[power_cols].resample('ME').agg(['mean', 'sum', 'max', 'min'])
+        monthly_stats = {col: stats[col] for col in power_cols}
 
-        if 'Grid' in df.columns:
-            summary['Grid_Import_kWh'] = df['Grid'].resample('M').sum()
-        if 'Grid+' in df.columns:
-            summary['Grid_Export_kWh'] = df['Grid+'].resample('M').sum()
-        if 'Solar' in df.columns:
-            summary['Solar_Production_kWh'] = df['Solar'].resample('M').sum()
+        # Create monthly summary from the monthly sums
+        summary_names = {
+            'Grid': 'Grid_Import_kWh',
+            'Grid+': 'Grid_Export_kWh',
+            'Solar': 'Solar_Production_kWh',
+        }
+        sums = stats.xs('sum', axis=1, level=1)
+        summary = sums[[c for c in summary_names if c in sums.columns]].rename(columns=summary_names)
 
         # Calculate net import/export
         if 'Grid_Import_kWh' in summary.columns and 'Grid_Export_kWh' in summary.columns:
@@ -202,25 +347,29 @@ class EGaugeAnalyzer:
         if df.empty:
             return pd.DataFrame()
 
-        # Extract hour of day
-        df_hourly = df.copy()
-        df_hourly['hour'] = df_hourly.index.hour
-        df_hourly['day_of_week'] = df_hourly.index.dayofweek
-        df_hourly['month'] = df_hourly.index.month
+        # Hour of day and day of week, materialised from the index exactly once
+        # and shared by the groupbys and the heatmap pivot
+        hour = df.index.hour.values
+        dow = df.index.dayofweek.values
 
         # Calculate hourly averages
-        hourly_avg = df_hourly.groupby('hour').mean()
+        hourly_avg = df.groupby(hour).mean()
 
         # Calculate weekday vs weekend patterns
-        df_hourly['is_weekend'] = df_hourly['day_of_week'].isin([5, 6])
-        weekday_hourly = df_hourly[~df_hourly['is_weekend']].groupby('hour').mean()
-        weekend_hourly = df_hourly[df_hourly['is_weekend']].groupby('hour').mean()
+        weekend_mask = dow >= 5
+        weekday_hourly = df.iloc[~weekend_mask].groupby(hour[~weekend_mask]).mean()
+        weekend_hourly = df.iloc[weekend_mask].groupby(hour[weekend_mask]).mean()
+
+        # Average grid import by day of week (rows) and hour (columns)
+        grid_pivot = None
+        if 'Grid' in df.columns:
+            grid_pivot = pivot_hour_dow(df['Grid'].to_numpy(), hour, dow)
 
         return {
             'hourly_avg': hourly_avg,
             'weekday_hourly': weekday_hourly,
             'weekend_hourly': weekend_hourly,
-            'df_hourly': df_hourly
+            'grid_pivot': grid_pivot
         }
 
     def create_visualizations(self, df: pd.DataFrame, monthly_data: Dict, hourly_data: Dict):
@@ -229,6 +378,21 @@ class EGaugeAnalyzer:
         """
         print("\nCreating visualizations...")
 
+        # Plotting libraries are only loaded when a dashboard is actually drawn
+        import matplotlib
+        if HEADLESS:
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        # Set style for better-looking plots
+        plt.style.use('seaborn-v0_8-darkgrid')
+        sns.set_palette("husl")
+
+        # Month labels shared by the monthly plots
+        summary = monthly_data.get('monthly_summary')
+        months_str = summary.index.strftime('%b %Y') if summary is not None else None
+
         # Create figure with subplots
         fig = plt.figure(figsize=(20, 24))
 
@@ -250,7 +414,7 @@ class EGaugeAnalyzer:
         ax2 = plt.subplot(6, 2, 2)
         if 'monthly_summary' in monthly_data and not monthly_data['monthly_summary'].empty:
             summary = monthly_data['monthly_summary']
-            months = summary.index.strftime('%b %Y')
+            months = months_str
             x = np.arange(len(months))
             width = 0.35
 
@@ -305,8 +469,8 @@ class EGaugeAnalyzer:
         ax5 = plt.subplot(6, 2, 5)
         if 'monthly_summary' in monthly_data and 'Net_Grid_kWh' in monthly_data['monthly_summary'].columns:
             summary = monthly_data['monthly_summary']
-            colors = ['red' if x > 0 else 'green' for x in summary['Net_Grid_kWh']]
-            ax5.bar(summary.index.strftime('%b %Y'), summary['Net_Grid_kWh'], color=colors, alpha=0.7)
+            colors = np.where(summary['Net_Grid_kWh'].to_numpy() > 0, 'red', 'green')
+            ax5.bar(months_str, summary['Net_Grid_kWh'], color=colors, alpha=0.7)
             ax5.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
             ax5.set_xlabel('Month')
             ax5.set_ylabel('Net Grid Usage (kWh)')
@@ -316,22 +480,21 @@ class EGaugeAnalyzer:
 
         # 6. Heatmap of hourly usage by day of week
         ax6 = plt.subplot(6, 2, 6)
-        if hourly_data and 'df_hourly' in hourly_data:
-            df_hourly = hourly_data['df_hourly']
-            if 'Grid' in df_hourly.columns:
-                pivot = df_hourly.pivot_table(values='Grid', index='day_of_week', columns='hour', aggfunc='mean')
-                sns.heatmap(pivot, cmap='YlOrRd', ax=ax6, cbar_kws={'label': 'Grid Import (kW)'})
-                ax6.set_yticklabels(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
-                ax6.set_xlabel('Hour of Day')
-                ax6.set_ylabel('Day of Week')
-                ax6.set_title('Grid Usage Heatmap by Hour and Day', fontsize=14, fontweight='bold')
+        if hourly_data and hourly_data.get('grid_pivot') is not None:
+            pivot = hourly_data['grid_pivot']
+            sns.heatmap(pivot, cmap='YlOrRd', ax=ax6, cbar_kws={'label': 'Grid Import (kW)'})
+            ax6.set_yticklabels(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+            ax6.set_xlabel('Hour of Day')
+            ax6.set_ylabel('Day of Week')
+            ax6.set_title('Grid Usage Heatmap by Hour and Day', fontsize=14, fontweight='bold')
 
         # 7. Solar production vs consumption scatter
         ax7 = plt.subplot(6, 2, 7)
         if 'Solar' in df.columns and 'Grid' in df.columns:
-            # Sample data to avoid too many points
-            sample_df = df.sample(min(1000, len(df)))
-            ax7.scatter(sample_df['Solar'], sample_df['Grid'], alpha=0.5, s=10)
+            # Bin every reading rather than scattering a random sample
+            hexbins = ax7.hexbin(df['Solar'].to_numpy(), df['Grid'].to_numpy(),
+                                 gridsize=50, mincnt=1, cmap='viridis')
+            fig.colorbar(hexbins, ax=ax7, label='Readings')
             ax7.set_xlabel('Solar Production (kW)')
             ax7.set_ylabel('Grid Import (kW)')
             ax7.set_title('Solar Production vs Grid Import Correlation', fontsize=14, fontweight='bold')
@@ -345,7 +508,7 @@ class EGaugeAnalyzer:
                 summary['Solar_Self_Consumption'] = summary['Solar_Production_kWh'] - summary['Grid_Export_kWh']
                 summary['Self_Consumption_Rate'] = (summary['Solar_Self_Consumption'] / summary['Solar_Production_kWh'] * 100).fillna(0)
 
-                ax8.bar(summary.index.strftime('%b %Y'), summary['Self_Consumption_Rate'], color='orange', alpha=0.7)
+                ax8.bar(months_str, summary['Self_Consumption_Rate'], color='orange', alpha=0.7)
                 ax8.set_xlabel('Month')
                 ax8.set_ylabel('Self Consumption Rate (%)')
                 ax8.set_title('Solar Self-Consumption Rate by Month', fontsize=14, fontweight='bold')
@@ -367,8 +530,8 @@ class EGaugeAnalyzer:
 
         # 10. Peak demand analysis
         ax10 = plt.subplot(6, 2, 10)
-        if 'Grid' in df.columns:
-            monthly_peak = df['Grid'].resample('M').max()
+        if 'Grid' in monthly_data.get('monthly_stats', {}):
+            monthly_peak = monthly_data['monthly_stats']['Grid']['max']
             ax10.bar(monthly_peak.index.strftime('%b %Y'), monthly_peak, color='darkred', alpha=0.7)
             ax10.set_xlabel('Month')
             ax10.set_ylabel('Peak Demand (kW)')
@@ -379,8 +542,11 @@ class EGaugeAnalyzer:
         # 11. Cumulative energy over time
         ax11 = plt.subplot(6, 2, 11)
         if 'Grid' in df.columns and 'Solar' in df.columns:
-            cumulative_grid = df['Grid'].cumsum() / 1000  # Convert to MWh
-            cumulative_solar = df['Solar'].cumsum() / 1000
+            # Accumulate in place on float32 copies; MWh precision is plenty for a plot
+            cumulative_grid = df['Grid'].to_numpy(dtype=np.float32) * np.float32(1e-3)
+            np.nancumsum(cumulative_grid, out=cumulative_grid)
+            cumulative_solar = df['Solar'].to_numpy(dtype=np.float32) * np.float32(1e-3)
+            np.nancumsum(cumulative_solar, out=cumulative_solar)
             ax11.plot(df.index, cumulative_grid, label='Cumulative Grid Import', linewidth=2)
             ax11.plot(df.index, cumulative_solar, label='Cumulative Solar Production', linewidth=2)
             ax11.set_xlabel('Date')
@@ -402,7 +568,7 @@ class EGaugeAnalyzer:
                 summary['Export_Revenue'] = summary['Grid_Export_kWh'] * export_rate
                 summary['Net_Cost'] = summary['Import_Cost'] - summary['Export_Revenue']
 
-                months = summary.index.strftime('%b %Y')
+                months = months_str
                 x = np.arange(len(months))
                 width = 0.35
 
@@ -425,6 +591,10 @@ class EGaugeAnalyzer:
         plt.savefig(filename, dpi=150, bbox_inches='tight')
         print(f"Visualizations saved to {filename}")
 
+        if HEADLESS:
+            # Release the figure's artists and render buffer once it is on disk
+            plt.close(fig)
+
         return fig
 
     def generate_report(self, df: pd.DataFrame, monthly_data: Dict, hourly_data: Dict):
@@ -509,33 +679,40 @@ def main():
     """
     Main function to run the analysis
     """
+    parser = argparse.ArgumentParser(description='Analyze eGauge power monitor data')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='print the text report only, without building the dashboard')
+    args = parser.parse_args()
+
     print("Starting eGauge Power Monitor Analysis")
     print("="*60)
 
     # Initialize analyzer
-    analyzer = EGaugeAnalyzer(EGAUGE_IP)
-
-    # Fetch historical data (1 year)
-    df = analyzer.fetch_historical_data(days_back=365)
+    with EGaugeAnalyzer(EGAUGE_IP) as analyzer:
+        # Fetch historical data (1 year)
+        df = analyzer.fetch_historical_data(days_back=365)
 
-    if df.empty:
-        print("No data available. Please check your eGauge connection.")
-        return
+        if df.empty:
+            print("No data available. Please check your eGauge connection.")
+            return
 
-    # Analyze monthly patterns
-    monthly_data = analyzer.analyze_monthly_patterns(df)
+        # Analyze monthly patterns
+        monthly_data = analyzer.analyze_monthly_patterns(df)
 
-    # Analyze hourly patterns
-    hourly_data = analyzer.analyze_hourly_patterns(df)
+        # Analyze hourly patterns
+        hourly_data = analyzer.analyze_hourly_patterns(df)
 
-    # Generate visualizations
-    fig = analyzer.create_visualizations(df, monthly_data, hourly_data)
+        # Generate visualizations
+        if not args.no_plots:
+            analyzer.create_visualizations(df, monthly_data, hourly_data)
 
-    # Generate report
-    analyzer.generate_report(df, monthly_data, hourly_data)
+        # Generate report
+        analyzer.generate_report(df, monthly_data, hourly_data)
 
     # Show the plot
-    plt.show()
+    if not args.no_plots and not HEADLESS:
+        import matplotlib.pyplot as plt
+        plt.show()
 
     print("\nAnalysis complete!")
 
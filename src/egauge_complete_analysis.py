@@ -4,91 +4,160 @@ eGauge Power Monitor Complete Analysis
 Comprehensive analysis with proper data parsing
 """
 
+import os
+import sys
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta
+import lxml.etree as LET
+from io import BytesIO
+from datetime import datetime
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.gridspec import GridSpec
-import seaborn as sns
+from dateutil import tz
+from typing import BinaryIO
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import requests_cache
+except ImportError:  # Optional: without it every run downloads fresh data
+    requests_cache = None
+
+try:
+    import numba
+except ImportError:  # Optional: falls back to the NumPy implementation below
+    numba = None
+
 # Configuration
 EGAUGE_IP = "10.10.20.241"
 
-# Set style
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+# Concurrent requests made while fetching the report data
+FETCH_WORKERS = 4
+
+# How long cached egauge-show responses stay fresh, in seconds, per period
+CACHE_EXPIRY = {'m': 86400, 'd': 3600, 'h': 300}
+
+# Local timezone used to turn eGauge epoch timestamps into wall-clock times
+LOCAL_TZ = tz.gettz()
+
+# Only open a window when someone is at a terminal (and, on Linux, has an X or
+# Wayland display); otherwise render straight to the PNG with Agg and skip GUI
+# backend probing
+INTERACTIVE = sys.stdout.isatty() and (
+    not sys.platform.startswith('linux')
+    or bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')))
+
+# Plot style is applied on the first dashboard only
+_STYLE_SET = False
+
+def to_local_index(epoch_seconds: np.ndarray) -> pd.DatetimeIndex:
+    """Vectorized equivalent of datetime.fromtimestamp over an array of epoch seconds"""
+    return pd.to_datetime(epoch_seconds, unit='s', utc=True).tz_convert(LOCAL_TZ).tz_localize(None)
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def interval_deltas(arr, scale):
+        """Scaled change from each row to the next (oldest first), NaN on the last row"""
+        n, m = arr.shape
+        out = np.empty((n, m))
+        for j in range(m):
+            for i in range(n - 1):
+                out[i, j] = (arr[i + 1, j] - arr[i, j]) * scale
+            out[n - 1, j] = np.nan
+        return out
+else:
+    def interval_deltas(arr, scale):
+        """Scaled change from each row to the next (oldest first), NaN on the last row"""
+        out = np.empty_like(arr)
+        np.subtract(arr[1:], arr[:-1], out=out[:-1])
+        out[:-1] *= scale
+        out[-1] = np.nan
+        return out
 
 class EGaugeDataParser:
     def __init__(self, ip_address: str):
         self.ip = ip_address
         self.base_url = f"http://{ip_address}/cgi-bin"
 
-    def parse_cumulative_data(self, xml_string: str, interval: str = 'hourly') -> pd.DataFrame:
-        """Parse cumulative energy data from eGauge XML"""
+        if requests_cache is not None:
+            # Reuse responses from recent runs; instant readings are never cached
+            urls_expire_after = {
+                f'{ip_address}/cgi-bin/egauge-show?{period}*': expiry
+                for period, expiry in CACHE_EXPIRY.items()
+            }
+            # Glob '?' matches any character (egauge-show's '-' too), so anchor on inst
+            urls_expire_after[f'{ip_address}/cgi-bin/egauge?inst*'] = requests_cache.DO_NOT_CACHE
+            self.session = requests_cache.CachedSession(
+                'egauge_cache', backend='sqlite', urls_expire_after=urls_expire_after)
+        else:
+            self.session = requests.Session()
+
+        # Keep one connection per concurrent fetch alive across the report's requests
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS))
+
+    def parse_cumulative_data(self, xml_stream: BinaryIO, interval: str = 'hourly') -> pd.DataFrame:
+        """Parse cumulative energy data from an eGauge XML byte stream"""
         try:
-            root = ET.fromstring(xml_string)
-
-            # Get column names
             columns = {}
-            for cname in root.findall('.//cname'):
-                did = cname.get('did')
-                name = cname.text
-                columns[int(did)] = name
+            data_elem = None
+            rows = []
+
+            # Single streaming pass: register names, then one value list per row
+            context = LET.iterparse(xml_stream, events=('start', 'end'),
+                                    tag=('data', 'cname', 'r'))
+            for event, elem in context:
+                if event == 'start':
+                    if elem.tag == 'data' and data_elem is None:
+                        # Get time info
+                        data_elem = elem
+                        time_stamp = int(elem.get('time_stamp'), 16)
+                        time_delta = int(elem.get('time_delta'))
+                    continue
+
+                if elem.tag == 'cname':
+                    # Get column names
+                    columns[int(elem.get('did'))] = elem.text
+                elif elem.tag == 'r':
+                    if not rows:
+                        dids = sorted(columns)
+                        pos = {did: j for j, did in enumerate(dids)}
+                    values = [np.nan] * len(dids)
+                    for i, c in enumerate(elem.iterchildren('c')):
+                        j = pos.get(i)
+                        if j is not None:
+                            # Store cumulative value in Wh
+                            values[j] = float(c.text) if c.text else 0
+                    rows.append(values)
+
+                    # Release the parsed row and its processed siblings
+                    elem.clear(keep_tail=True)
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
 
-            # Get time info
-            data_elem = root.find('.//data')
             if data_elem is None:
                 return pd.DataFrame()
 
-            time_stamp = int(data_elem.get('time_stamp'), 16)
-            time_delta = int(data_elem.get('time_delta'))
-
-            # Parse data rows
-            rows = []
-            current_time = datetime.fromtimestamp(time_stamp)
-
-            for r in root.findall('.//r'):
-                row_data = {'timestamp': current_time}
-
-                for i, c in enumerate(r.findall('c')):
-                    if i in columns:
-                        # Store cumulative value in Wh
-                        value = float(c.text) if c.text else 0
-                        row_data[columns[i]] = value
-
-                rows.append(row_data)
-                current_time = current_time - timedelta(seconds=time_delta)
-
-            df = pd.DataFrame(rows)
-            if not df.empty:
-                df = df.set_index('timestamp')
-                df = df.sort_index()
-
-                # Calculate differences (actual consumption/production)
-                for col in df.columns:
-                    df[f'{col}_delta'] = -df[col].diff(-1)  # Negative diff for forward calculation
-
-                # Convert delta values to kWh based on interval
-                if interval == 'monthly':
-                    # Monthly data - values are already in Wh, convert to kWh
-                    for col in df.columns:
-                        if '_delta' in col:
-                            df[col] = df[col] / 1000.0
-                elif interval == 'daily':
-                    # Daily data - convert Wh to kWh
-                    for col in df.columns:
-                        if '_delta' in col:
-                            df[col] = df[col] / 1000.0
-                elif interval == 'hourly':
-                    # Hourly data - convert Wh to kW (power)
-                    for col in df.columns:
-                        if '_delta' in col:
-                            df[col] = df[col] / 1000.0  # Convert to kW
+            df = pd.DataFrame()
+            if rows:
+                # Rows step back time_delta seconds from the newest reading;
+                # flip both to get oldest-first without sorting
+                epochs = time_stamp - np.arange(len(rows), dtype=np.int64) * time_delta
+                values = np.ascontiguousarray(np.array(rows)[::-1])
+
+                # Convert delta values from Wh: kWh for monthly/daily data,
+                # kW (average power) for hourly data
+                scale = 1e-3 if interval in ('monthly', 'daily', 'hourly') else 1.0
+
+                # Calculate differences (actual consumption/production) and convert
+                # in one pass: each row gets the energy up to the next row. Only
+                # these deltas are used downstream, so the cumulative values are
+                # not kept in the frame.
+                delta = interval_deltas(values, scale)
+                df = pd.DataFrame(delta, columns=[f'{columns[did]}_delta' for did in dids],
+                                  index=to_local_index(epochs[::-1]).rename('timestamp'))
 
             return df
 
@@ -101,13 +170,18 @@ class EGaugeDataParser:
         url = f"{self.base_url}/egauge-show?{period}&n={count}"
 
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
             interval_map = {'m': 'monthly', 'd': 'daily', 'h': 'hourly'}
             interval = interval_map.get(period, 'hourly')
 
-            return self.parse_cumulative_data(response.content, interval)
+            with self.session.get(url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                if requests_cache is None:
+                    # Parse while the body downloads instead of buffering it first
+                    response.raw.decode_content = True
+                    return self.parse_cumulative_data(response.raw, interval)
+
+                # The cache reads the whole body to store it, so parse that copy
+                return self.parse_cumulative_data(BytesIO(response.content), interval)
 
         except Exception as e:
             print(f"Error fetching {period} data: {e}")
@@ -117,7 +191,7 @@ class EGaugeDataParser:
         """Get current instantaneous power readings"""
         url = f"{self.base_url}/egauge?inst"
         try:
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             root = ET.fromstring(response.content)
 
             readings = {}
@@ -149,16 +223,36 @@ class PowerAnalysisReport:
 
         # Fetch all data
         print("\nFetching data from eGauge...")
-        monthly_df = self.parser.fetch_data('m', 12)  # 12 months
-        daily_df = self.parser.fetch_data('d', 365)   # 365 days
-        hourly_df = self.parser.fetch_data('h', 24*7)  # 1 week hourly
-        current = self.parser.get_current_power()
+        # The four requests are independent, so overlap their round trips
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            monthly_future = executor.submit(self.parser.fetch_data, 'm', 12)  # 12 months
+            daily_future = executor.submit(self.parser.fetch_data, 'd', 365)   # 365 days
+            hourly_future = executor.submit(self.parser.fetch_data, 'h', 24*7)  # 1 week hourly
+            current_future = executor.submit(self.parser.get_current_power)
+
+            monthly_df = monthly_future.result()
+            daily_df = daily_future.result()
+            hourly_df = hourly_future.result()
+            current = current_future.result()
 
         print(f"  Monthly data points: {len(monthly_df)}")
         print(f"  Daily data points: {len(daily_df)}")
         print(f"  Hourly data points: {len(hourly_df)}")
 
         # Current status
+        self.print_current_status(current)
+
+        # Series used by both the dashboard and the statistics report
+        series = self.precompute_series(monthly_df, daily_df, hourly_df)
+
+        # Generate visualizations
+        self.create_comprehensive_dashboard(monthly_df, daily_df, hourly_df, current, series)
+
+        # Generate statistics
+        self.print_detailed_statistics(monthly_df, daily_df, hourly_df, series)
+
+    def print_current_status(self, current: dict):
+        """Print the instantaneous power readings"""
         if current:
             print("\n" + "-"*50)
             print("CURRENT STATUS")
@@ -170,19 +264,65 @@ class PowerAnalysisReport:
             net_grid = current.get('Grid_Incoming', 0) - current.get('Grid_Outgoing', 0)
             print(f"Net Grid:        {net_grid:8.2f} kW {'(importing)' if net_grid > 0 else '(exporting)'}")
 
-        # Generate visualizations
-        self.create_comprehensive_dashboard(monthly_df, daily_df, hourly_df, current)
-
-        # Generate statistics
-        self.print_detailed_statistics(monthly_df, daily_df, hourly_df)
-
-    def create_comprehensive_dashboard(self, monthly_df, daily_df, hourly_df, current):
+    def precompute_series(self, monthly_df, daily_df, hourly_df) -> dict:
+        """Absolute deltas and aggregates, computed once per report (None if absent)"""
+        def abs_delta(df, col):
+            return df[col].abs() if col in df.columns else None
+
+        # Average power by hour of day
+        hourly_avg = None
+        delta_cols = [col for col in ('Grid_delta', 'Solar_delta') if col in hourly_df.columns]
+        if delta_cols:
+            hourly_avg = hourly_df.groupby(hourly_df.index.hour)[delta_cols].mean().abs()
+
+        # Peak daily grid usage in each month, grouped on the integer month
+        # ordinal and only turned back into Periods for the handful of labels
+        monthly_peaks = None
+        if 'Grid_delta' in daily_df.columns:
+            month_key = (daily_df.index.year.to_numpy() - 1970) * 12 + daily_df.index.month.to_numpy() - 1
+            monthly_peaks = daily_df['Grid_delta'].groupby(month_key).max().abs()
+            monthly_peaks.index = pd.PeriodIndex.from_ordinals(monthly_peaks.index, freq='M')
+
+        return {
+            'monthly_grid': abs_delta(monthly_df, 'Grid_delta'),
+            'monthly_solar': abs_delta(monthly_df, 'Solar_delta'),
+            'daily_grid': abs_delta(daily_df, 'Grid_delta'),
+            'daily_solar': abs_delta(daily_df, 'Solar_delta'),
+            'hourly_avg': hourly_avg,
+            'monthly_peaks': monthly_peaks,
+        }
+
+    def create_comprehensive_dashboard(self, monthly_df, daily_df, hourly_df, current, series):
         """Create comprehensive visualization dashboard"""
+        global _STYLE_SET
+
+        # Plotting libraries are only loaded when a dashboard is actually drawn
+        import matplotlib
+        if not INTERACTIVE:
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import matplotlib.dates as mdates
+        from matplotlib.gridspec import GridSpec
+        import seaborn as sns
+
+        if not _STYLE_SET:
+            # Set style
+            plt.style.use('seaborn-v0_8-darkgrid')
+            sns.set_palette("husl")
+            _STYLE_SET = True
+
+        m_grid, m_solar = series['monthly_grid'], series['monthly_solar']
+        d_grid, d_solar = series['daily_grid'], series['daily_solar']
 
         # Create figure with custom layout
         fig = plt.figure(figsize=(24, 16))
         gs = GridSpec(4, 4, figure=fig, hspace=0.3, wspace=0.25)
 
+        # Hour and weekday of each hourly reading for the weekly heatmap
+        if not hourly_df.empty:
+            hour_vals = hourly_df.index.hour.rename('hour')
+            day_vals = hourly_df.index.dayofweek.rename('day')
+
         # Define color scheme
         grid_color = '#E74C3C'
         solar_color = '#27AE60'
@@ -193,19 +333,16 @@ class PowerAnalysisReport:
         ax1 = fig.add_subplot(gs[0, :2])
         if not monthly_df.empty:
             # Use delta columns for actual monthly consumption/production
-            grid_data = monthly_df.get('Grid_delta', pd.Series())
-            solar_data = monthly_df.get('Solar_delta', pd.Series())
-
-            if not grid_data.empty or not solar_data.empty:
+            if m_grid is not None or m_solar is not None:
                 months = monthly_df.index.strftime('%b\n%Y')
                 x = np.arange(len(months))
                 width = 0.35
 
-                if not grid_data.empty:
-                    ax1.bar(x - width/2, grid_data.abs(), width,
+                if m_grid is not None:
+                    ax1.bar(x - width/2, m_grid, width,
                            label='Grid Consumption', color=grid_color, alpha=0.8)
-                if not solar_data.empty:
-                    ax1.bar(x + width/2, solar_data.abs(), width,
+                if m_solar is not None:
+                    ax1.bar(x + width/2, m_solar, width,
                            label='Solar Production', color=solar_color, alpha=0.8)
 
                 ax1.set_xlabel('Month', fontsize=11)
@@ -221,9 +358,9 @@ class PowerAnalysisReport:
         if not daily_df.empty:
             recent = daily_df.head(30)  # Most recent 30 days
             if 'Grid_delta' in recent.columns and 'Solar_delta' in recent.columns:
-                ax2.fill_between(recent.index, 0, recent['Solar_delta'].abs(),
+                ax2.fill_between(recent.index, 0, d_solar.head(30),
                                color=solar_color, alpha=0.6, label='Solar')
-                ax2.fill_between(recent.index, 0, -recent['Grid_delta'].abs(),
+                ax2.fill_between(recent.index, 0, -d_grid.head(30),
                                color=grid_color, alpha=0.6, label='Grid')
                 ax2.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
                 ax2.set_xlabel('Date', fontsize=11)
@@ -237,12 +374,11 @@ class PowerAnalysisReport:
         # 3. Hourly Pattern
         ax3 = fig.add_subplot(gs[1, 0])
         if not hourly_df.empty:
-            hourly_df['hour'] = hourly_df.index.hour
-            hourly_avg = hourly_df.groupby('hour')[['Grid_delta', 'Solar_delta']].mean()
+            hourly_avg = series['hourly_avg']
 
-            ax3.plot(hourly_avg.index, hourly_avg['Grid_delta'].abs(),
+            ax3.plot(hourly_avg.index, hourly_avg['Grid_delta'],
                     marker='o', linewidth=2, label='Grid', color=grid_color)
-            ax3.plot(hourly_avg.index, hourly_avg['Solar_delta'].abs(),
+            ax3.plot(hourly_avg.index, hourly_avg['Solar_delta'],
                     marker='s', linewidth=2, label='Solar', color=solar_color)
             ax3.set_xlabel('Hour of Day', fontsize=11)
             ax3.set_ylabel('Average Power (kW)', fontsize=11)
@@ -278,12 +414,8 @@ class PowerAnalysisReport:
         # 5. Weekly Heatmap
         ax5 = fig.add_subplot(gs[1, 2:])
         if not hourly_df.empty and len(hourly_df) > 24:
-            hourly_df['hour'] = hourly_df.index.hour
-            hourly_df['day'] = hourly_df.index.dayofweek
-
-            pivot = hourly_df.pivot_table(values='Grid_delta', index='day',
-                                         columns='hour', aggfunc='mean')
-            pivot = pivot.abs()
+            pivot = (hourly_df['Grid_delta'].groupby([day_vals, hour_vals]).mean()
+                     .abs().unstack('hour'))
 
             if not pivot.empty:
                 sns.heatmap(pivot, cmap='YlOrRd', ax=ax5,
@@ -318,12 +450,9 @@ class PowerAnalysisReport:
         # 7. Monthly Net Energy
         ax7 = fig.add_subplot(gs[2, 2])
         if not monthly_df.empty:
-            grid_monthly = monthly_df.get('Grid_delta', pd.Series()).abs()
-            solar_monthly = monthly_df.get('Solar_delta', pd.Series()).abs()
-
-            if not grid_monthly.empty and not solar_monthly.empty:
-                net_energy = solar_monthly - grid_monthly
-                colors_net = [solar_color if x > 0 else grid_color for x in net_energy]
+            if m_grid is not None and m_solar is not None:
+                net_energy = m_solar - m_grid
+                colors_net = np.where(net_energy.to_numpy() > 0, solar_color, grid_color)
 
                 months_short = monthly_df.index.strftime('%b')
                 ax7.bar(range(len(net_energy)), net_energy, color=colors_net, alpha=0.8)
@@ -341,16 +470,13 @@ class PowerAnalysisReport:
             import_rate = 0.15  # $/kWh
             export_rate = 0.08  # $/kWh
 
-            grid_monthly = monthly_df.get('Grid_delta', pd.Series()).abs()
-
-            if not grid_monthly.empty:
-                import_cost = grid_monthly * import_rate
+            if m_grid is not None:
+                import_cost = m_grid * import_rate
 
                 # Estimate export based on solar excess
-                if 'Solar_delta' in monthly_df.columns:
-                    solar_monthly = monthly_df['Solar_delta'].abs()
+                if m_solar is not None:
                     # Rough estimate: 30% of solar is exported
-                    export_revenue = solar_monthly * 0.3 * export_rate
+                    export_revenue = m_solar * 0.3 * export_rate
                     net_cost = import_cost - export_revenue
 
                     months_short = monthly_df.index.strftime('%b')
@@ -373,7 +499,7 @@ class PowerAnalysisReport:
         # 9. Solar Efficiency by Month
         ax9 = fig.add_subplot(gs[3, 0])
         if not monthly_df.empty and 'Solar_delta' in monthly_df.columns:
-            solar_monthly = monthly_df['Solar_delta'].abs()
+            solar_monthly = m_solar
             months_short = monthly_df.index.strftime('%b')
 
             # Calculate average daily production for each month
@@ -391,9 +517,8 @@ class PowerAnalysisReport:
         # 10. Peak Demand Analysis
         ax10 = fig.add_subplot(gs[3, 1])
         if not daily_df.empty and 'Grid_delta' in daily_df.columns:
-            # Group by month and find peak days
-            daily_df['month'] = daily_df.index.to_period('M')
-            monthly_peaks = daily_df.groupby('month')['Grid_delta'].max().abs()
+            # Peak day of each month
+            monthly_peaks = series['monthly_peaks']
 
             if len(monthly_peaks) > 0:
                 months_str = [str(m) for m in monthly_peaks.index]
@@ -410,21 +535,27 @@ class PowerAnalysisReport:
         ax11 = fig.add_subplot(gs[3, 2])
         if not daily_df.empty:
             if 'Grid_delta' in daily_df.columns and 'Solar_delta' in daily_df.columns:
-                grid_daily = daily_df['Grid_delta'].abs()
-                solar_daily = daily_df['Solar_delta'].abs()
+                grid_clean = d_grid.to_numpy()
+                solar_clean = d_solar.to_numpy()
 
-                # Remove outliers for better visualization
-                grid_clean = grid_daily[grid_daily < grid_daily.quantile(0.95)]
-                solar_clean = solar_daily[solar_daily < solar_daily.quantile(0.95)]
+                # Remove outliers for better visualization, keeping the days paired
+                mask = (np.isfinite(grid_clean) & np.isfinite(solar_clean)
+                        & (grid_clean < np.nanquantile(grid_clean, 0.95))
+                        & (solar_clean < np.nanquantile(solar_clean, 0.95)))
+                grid_clean, solar_clean = grid_clean[mask], solar_clean[mask]
 
                 # Create scatter plot
                 ax11.scatter(solar_clean, grid_clean, alpha=0.5, s=20, color='purple')
 
-                # Add trend line
-                z = np.polyfit(solar_clean.fillna(0), grid_clean.fillna(0), 1)
-                p = np.poly1d(z)
-                x_trend = np.linspace(0, solar_clean.max(), 100)
-                ax11.plot(x_trend, p(x_trend), "r--", alpha=0.8, linewidth=2)
+                # Add least-squares trend line (closed form for a straight line)
+                solar_dev = solar_clean - solar_clean.mean()
+                grid_dev = grid_clean - grid_clean.mean()
+                solar_var = solar_dev @ solar_dev
+                if solar_clean.size > 1 and solar_var > 0:
+                    slope = (solar_dev @ grid_dev) / solar_var
+                    intercept = grid_clean.mean() - slope * solar_clean.mean()
+                    x_trend = np.linspace(0, solar_clean.max(), 100)
+                    ax11.plot(x_trend, slope * x_trend + intercept, "r--", alpha=0.8, linewidth=2)
 
                 ax11.set_xlabel('Solar Production (kWh/day)', fontsize=11)
                 ax11.set_ylabel('Grid Import (kWh/day)', fontsize=11)
@@ -435,32 +566,42 @@ class PowerAnalysisReport:
         ax12 = fig.add_subplot(gs[3, 3])
         ax12.axis('off')
 
-        summary_text = "SUMMARY STATISTICS\n" + "="*25 + "\n\n"
+        summary_lines = ["SUMMARY STATISTICS", "="*25, ""]
 
         if not monthly_df.empty:
             if 'Grid_delta' in monthly_df.columns:
-                total_grid = monthly_df['Grid_delta'].abs().sum()
-                avg_grid = monthly_df['Grid_delta'].abs().mean()
-                summary_text += f"Grid Consumption:\n"
-                summary_text += f"  Total: {total_grid:,.0f} kWh\n"
-                summary_text += f"  Monthly Avg: {avg_grid:,.0f} kWh\n\n"
+                total_grid = m_grid.sum()
+                avg_grid = m_grid.mean()
+                summary_lines += [
+                    "Grid Consumption:",
+                    f"  Total: {total_grid:,.0f} kWh",
+                    f"  Monthly Avg: {avg_grid:,.0f} kWh",
+                    "",
+                ]
 
             if 'Solar_delta' in monthly_df.columns:
-                total_solar = monthly_df['Solar_delta'].abs().sum()
-                avg_solar = monthly_df['Solar_delta'].abs().mean()
-                summary_text += f"Solar Production:\n"
-                summary_text += f"  Total: {total_solar:,.0f} kWh\n"
-                summary_text += f"  Monthly Avg: {avg_solar:,.0f} kWh\n\n"
+                total_solar = m_solar.sum()
+                avg_solar = m_solar.mean()
+                summary_lines += [
+                    "Solar Production:",
+                    f"  Total: {total_solar:,.0f} kWh",
+                    f"  Monthly Avg: {avg_solar:,.0f} kWh",
+                    "",
+                ]
 
             # Financial summary
             if 'Grid_delta' in monthly_df.columns:
                 annual_cost = total_grid * 0.15
                 if 'Solar_delta' in monthly_df.columns:
                     solar_savings = total_solar * 0.10  # Estimated savings
-                    summary_text += f"Financial (Est.):\n"
-                    summary_text += f"  Grid Cost: ${annual_cost:,.0f}\n"
-                    summary_text += f"  Solar Savings: ${solar_savings:,.0f}\n"
-                    summary_text += f"  Net Benefit: ${(solar_savings-annual_cost):,.0f}"
+                    summary_lines += [
+                        "Financial (Est.):",
+                        f"  Grid Cost: ${annual_cost:,.0f}",
+                        f"  Solar Savings: ${solar_savings:,.0f}",
+                        f"  Net Benefit: ${(solar_savings-annual_cost):,.0f}",
+                    ]
+
+        summary_text = "\n".join(summary_lines)
 
         ax12.text(0.05, 0.95, summary_text, transform=ax12.transAxes,
                  fontsize=10, verticalalignment='top', fontfamily='monospace',
@@ -472,137 +613,156 @@ class PowerAnalysisReport:
 
         plt.tight_layout()
 
-        # Save figure
+        # Save figure (layout is already tight, so skip the second bbox pass)
         filename = f'egauge_complete_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png'
-        plt.savefig(filename, dpi=150, bbox_inches='tight')
+        plt.savefig(filename, dpi=100)
         print(f"\n✅ Dashboard saved to: {filename}")
 
-        plt.show()
+        if INTERACTIVE:
+            plt.show()
+        else:
+            plt.close(fig)
 
-    def print_detailed_statistics(self, monthly_df, daily_df, hourly_df):
+    def print_detailed_statistics(self, monthly_df, daily_df, hourly_df, series):
         """Print detailed statistics report"""
+        m_grid, m_solar = series['monthly_grid'], series['monthly_solar']
+        d_grid, d_solar = series['daily_grid'], series['daily_solar']
 
-        print("\n" + "="*70)
-        print(" "*20 + "DETAILED STATISTICS")
-        print("="*70)
+        # Collect the report and write it in one go
+        lines = []
+
+        lines.append("\n" + "="*70)
+        lines.append(" "*20 + "DETAILED STATISTICS")
+        lines.append("="*70)
 
         # Monthly Statistics
         if not monthly_df.empty:
-            print("\n📊 MONTHLY STATISTICS (Past 12 Months)")
-            print("-"*50)
+            lines.append("\n📊 MONTHLY STATISTICS (Past 12 Months)")
+            lines.append("-"*50)
 
             if 'Grid_delta' in monthly_df.columns:
-                grid_monthly = monthly_df['Grid_delta'].abs()
-                print(f"\nGrid Consumption:")
-                print(f"  Total:        {grid_monthly.sum():>12,.0f} kWh")
-                print(f"  Monthly Avg:  {grid_monthly.mean():>12,.0f} kWh")
-                print(f"  Peak Month:   {grid_monthly.max():>12,.0f} kWh")
-                print(f"  Lowest Month: {grid_monthly.min():>12,.0f} kWh")
+                grid_monthly = m_grid
+                lines.append(f"\nGrid Consumption:")
+                lines.append(f"  Total:        {grid_monthly.sum():>12,.0f} kWh")
+                lines.append(f"  Monthly Avg:  {grid_monthly.mean():>12,.0f} kWh")
+                lines.append(f"  Peak Month:   {grid_monthly.max():>12,.0f} kWh")
+                lines.append(f"  Lowest Month: {grid_monthly.min():>12,.0f} kWh")
 
             if 'Solar_delta' in monthly_df.columns:
-                solar_monthly = monthly_df['Solar_delta'].abs()
-                print(f"\nSolar Production:")
-                print(f"  Total:        {solar_monthly.sum():>12,.0f} kWh")
-                print(f"  Monthly Avg:  {solar_monthly.mean():>12,.0f} kWh")
-                print(f"  Peak Month:   {solar_monthly.max():>12,.0f} kWh")
-                print(f"  Lowest Month: {solar_monthly.min():>12,.0f} kWh")
+                solar_monthly = m_solar
+                lines.append(f"\nSolar Production:")
+                lines.append(f"  Total:        {solar_monthly.sum():>12,.0f} kWh")
+                lines.append(f"  Monthly Avg:  {solar_monthly.mean():>12,.0f} kWh")
+                lines.append(f"  Peak Month:   {solar_monthly.max():>12,.0f} kWh")
+                lines.append(f"  Lowest Month: {solar_monthly.min():>12,.0f} kWh")
 
             # Calculate self-consumption
             if 'Grid_delta' in monthly_df.columns and 'Solar_delta' in monthly_df.columns:
                 total_consumption = grid_monthly.sum()
                 total_solar = solar_monthly.sum()
                 solar_offset = (total_solar / (total_consumption + total_solar) * 100)
-                print(f"\n⚡ Solar Offset: {solar_offset:.1f}% of total consumption")
+                lines.append(f"\n⚡ Solar Offset: {solar_offset:.1f}% of total consumption")
 
         # Daily Statistics
         if not daily_df.empty and len(daily_df) > 30:
-            print("\n📅 DAILY STATISTICS (Past Year)")
-            print("-"*50)
+            lines.append("\n📅 DAILY STATISTICS (Past Year)")
+            lines.append("-"*50)
 
             if 'Grid_delta' in daily_df.columns:
-                grid_daily = daily_df['Grid_delta'].abs()
-                print(f"\nDaily Grid Usage:")
-                print(f"  Average:      {grid_daily.mean():>12,.1f} kWh/day")
-                print(f"  Peak Day:     {grid_daily.max():>12,.1f} kWh")
-                print(f"  Minimum Day:  {grid_daily.min():>12,.1f} kWh")
-                print(f"  Std Dev:      {grid_daily.std():>12,.1f} kWh")
+                grid_daily = d_grid
+                lines.append(f"\nDaily Grid Usage:")
+                lines.append(f"  Average:      {grid_daily.mean():>12,.1f} kWh/day")
+                lines.append(f"  Peak Day:     {grid_daily.max():>12,.1f} kWh")
+                lines.append(f"  Minimum Day:  {grid_daily.min():>12,.1f} kWh")
+                lines.append(f"  Std Dev:      {grid_daily.std():>12,.1f} kWh")
 
             if 'Solar_delta' in daily_df.columns:
-                solar_daily = daily_df['Solar_delta'].abs()
-                print(f"\nDaily Solar Production:")
-                print(f"  Average:      {solar_daily.mean():>12,.1f} kWh/day")
-                print(f"  Peak Day:     {solar_daily.max():>12,.1f} kWh")
-                print(f"  Minimum Day:  {solar_daily.min():>12,.1f} kWh")
-                print(f"  Std Dev:      {solar_daily.std():>12,.1f} kWh")
+                solar_daily = d_solar
+                lines.append(f"\nDaily Solar Production:")
+                lines.append(f"  Average:      {solar_daily.mean():>12,.1f} kWh/day")
+                lines.append(f"  Peak Day:     {solar_daily.max():>12,.1f} kWh")
+                lines.append(f"  Minimum Day:  {solar_daily.min():>12,.1f} kWh")
+                lines.append(f"  Std Dev:      {solar_daily.std():>12,.1f} kWh")
 
         # Hourly Statistics
         if not hourly_df.empty:
-            print("\n⏰ HOURLY PATTERNS (Past Week)")
-            print("-"*50)
+            lines.append("\n⏰ HOURLY PATTERNS (Past Week)")
+            lines.append("-"*50)
 
-            hourly_df['hour'] = hourly_df.index.hour
+            hourly_avg = series['hourly_avg']
 
             if 'Grid_delta' in hourly_df.columns:
-                hourly_grid = hourly_df.groupby('hour')['Grid_delta'].mean().abs()
+                hourly_grid = hourly_avg['Grid_delta']
                 peak_hour = hourly_grid.idxmax()
                 low_hour = hourly_grid.idxmin()
-                print(f"\nGrid Usage by Hour:")
-                print(f"  Peak Hour:    {peak_hour:>2d}:00 ({hourly_grid[peak_hour]:.2f} kW avg)")
-                print(f"  Lowest Hour:  {low_hour:>2d}:00 ({hourly_grid[low_hour]:.2f} kW avg)")
-                print(f"  Daily Range:  {hourly_grid.max() - hourly_grid.min():.2f} kW")
+                lines.append(f"\nGrid Usage by Hour:")
+                lines.append(f"  Peak Hour:    {peak_hour:>2d}:00 ({hourly_grid[peak_hour]:.2f} kW avg)")
+                lines.append(f"  Lowest Hour:  {low_hour:>2d}:00 ({hourly_grid[low_hour]:.2f} kW avg)")
+                lines.append(f"  Daily Range:  {hourly_grid.max() - hourly_grid.min():.2f} kW")
 
             if 'Solar_delta' in hourly_df.columns:
-                hourly_solar = hourly_df.groupby('hour')['Solar_delta'].mean().abs()
+                hourly_solar = hourly_avg['Solar_delta']
                 solar_peak = hourly_solar.idxmax()
-                print(f"\nSolar Production by Hour:")
-                print(f"  Peak Hour:    {solar_peak:>2d}:00 ({hourly_solar[solar_peak]:.2f} kW avg)")
-                print(f"  Production Window: {hourly_solar[hourly_solar > 0.1].index[0]}:00 - {hourly_solar[hourly_solar > 0.1].index[-1]}:00")
+                lines.append(f"\nSolar Production by Hour:")
+                lines.append(f"  Peak Hour:    {solar_peak:>2d}:00 ({hourly_solar[solar_peak]:.2f} kW avg)")
+                lines.append(f"  Production Window: {hourly_solar[hourly_solar > 0.1].index[0]}:00 - {hourly_solar[hourly_solar > 0.1].index[-1]}:00")
 
         # Financial Analysis
-        print("\n💰 FINANCIAL ANALYSIS (Estimated)")
-        print("-"*50)
+        lines.append("\n💰 FINANCIAL ANALYSIS (Estimated)")
+        lines.append("-"*50)
 
         if not monthly_df.empty and 'Grid_delta' in monthly_df.columns:
             import_rate = 0.15  # $/kWh
             export_rate = 0.08  # $/kWh
 
-            total_grid = monthly_df['Grid_delta'].abs().sum()
+            total_grid = m_grid.sum()
             annual_grid_cost = total_grid * import_rate
 
-            print(f"\nEstimated Annual Costs:")
-            print(f"  Grid Import (@${import_rate}/kWh):  ${annual_grid_cost:>10,.2f}")
+            lines.append(f"\nEstimated Annual Costs:")
+            lines.append(f"  Grid Import (@${import_rate}/kWh):  ${annual_grid_cost:>10,.2f}")
 
             if 'Solar_delta' in monthly_df.columns:
-                total_solar = monthly_df['Solar_delta'].abs().sum()
+                total_solar = m_solar.sum()
                 solar_value = total_solar * import_rate
                 export_revenue = total_solar * 0.3 * export_rate  # Assume 30% exported
 
-                print(f"  Solar Value (@${import_rate}/kWh): ${solar_value:>10,.2f}")
-                print(f"  Export Revenue (@${export_rate}/kWh): ${export_revenue:>10,.2f}")
-                print(f"  Net Savings:                  ${(solar_value - annual_grid_cost):>10,.2f}")
-                print(f"  Monthly Avg Savings:          ${((solar_value - annual_grid_cost)/12):>10,.2f}")
+                lines.append(f"  Solar Value (@${import_rate}/kWh): ${solar_value:>10,.2f}")
+                lines.append(f"  Export Revenue (@${export_rate}/kWh): ${export_revenue:>10,.2f}")
+                lines.append(f"  Net Savings:                  ${(solar_value - annual_grid_cost):>10,.2f}")
+                lines.append(f"  Monthly Avg Savings:          ${((solar_value - annual_grid_cost)/12):>10,.2f}")
 
         # Peak demand charges (if applicable)
         if not daily_df.empty and 'Grid_delta' in daily_df.columns:
             peak_demand_charge = 15  # $/kW per month
-            monthly_peaks = daily_df.groupby(daily_df.index.to_period('M'))['Grid_delta'].max().abs()
+            monthly_peaks = series['monthly_peaks']
             avg_peak = monthly_peaks.mean()
 
-            print(f"\nPeak Demand Charges:")
-            print(f"  Avg Monthly Peak: {avg_peak:.1f} kWh/day")
-            print(f"  Est. Demand Charge: ${(avg_peak * peak_demand_charge / 24):.2f}/month")
+            lines.append(f"\nPeak Demand Charges:")
+            lines.append(f"  Avg Monthly Peak: {avg_peak:.1f} kWh/day")
+            lines.append(f"  Est. Demand Charge: ${(avg_peak * peak_demand_charge / 24):.2f}/month")
 
-        print("\n" + "="*70)
-        print("Analysis Complete!")
-        print("="*70)
+        lines.append("\n" + "="*70)
+        lines.append("Analysis Complete!")
+        lines.append("="*70)
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
     """Main execution function"""
+    arg_parser = argparse.ArgumentParser(description='Complete eGauge power analysis report')
+    arg_parser.add_argument('--current-only', action='store_true',
+                            help='print the current power readings and exit')
+    args = arg_parser.parse_args()
+
     # Initialize parser and analyzer
     parser = EGaugeDataParser(EGAUGE_IP)
     analyzer = PowerAnalysisReport(parser)
 
+    if args.current_only:
+        analyzer.print_current_status(parser.get_current_power())
+        return
+
     # Generate complete analysis
     analyzer.generate_complete_analysis()
 
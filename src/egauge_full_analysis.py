@@ -4,12 +4,28 @@ eGauge Power Monitor Comprehensive Analysis
 Analyzes power consumption and solar production data
 """
 
+import os
+import sys
 import requests
-import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree as ET
 import json
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
+from dateutil import tz
+import matplotlib
+
+# Only open a window when someone is at a terminal (and, on Linux, has an X or
+# Wayland display); otherwise render straight to the PNG with Agg and skip GUI
+# backend probing
+INTERACTIVE = sys.stdout.isatty() and (
+    not sys.platform.startswith('linux')
+    or bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')))
+if not INTERACTIVE:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import seaborn as sns
@@ -18,6 +34,50 @@ warnings.filterwarnings('ignore')
 
 # Configuration
 EGAUGE_IP = "10.10.20.241"
+FETCH_WORKERS = 4  # Pooled connections to the device
+
+# Local timezone used to turn eGauge epoch timestamps into wall-clock times
+LOCAL_TZ = tz.gettz()
+
+# XPath queries shared by the collector's parsers, compiled once; text()
+# queries return plain strings rather than element wrappers
+_TS_XPATH = ET.XPath('timestamp/text()', smart_strings=False)
+_DATA_XPATH = ET.XPath('data')
+_CNAME_XPATH = ET.XPath('cname/text()', smart_strings=False)
+_COL_TEXT_XPATH = ET.XPath('.//column/text()', smart_strings=False)
+_REG_XPATH = ET.XPath('.//r')
+_INST_XPATH = ET.XPath('i/text()', smart_strings=False)
+
+
+def to_local_index(epoch_seconds: np.ndarray) -> pd.DatetimeIndex:
+    """Vectorized equivalent of datetime.fromtimestamp over an array of epoch seconds"""
+    return pd.to_datetime(epoch_seconds, unit='s', utc=True).tz_convert(LOCAL_TZ).tz_localize(None)
+
+
+def _col_abs(df: pd.DataFrame, col: str):
+    """Absolute values of a column as a NumPy array, or None if the column is missing"""
+    return np.abs(df[col].to_numpy()) if col in df.columns else None
+
+
+def _nan_stats(arr: np.ndarray):
+    """Total, mean and positions of the max and min of an array, skipping NaN (positions None if all NaN)"""
+    # Reduce over the finite values only, mapping their argmax/argmin back to arr
+    idx = np.flatnonzero(np.isfinite(arr))
+    if not idx.size:
+        return 0.0, np.nan, None, None
+    values = arr[idx]
+    total = values.sum()
+    return total, total / values.size, idx[values.argmax()], idx[values.argmin()]
+
+
+def _value_at(arr: np.ndarray, i):
+    """arr[i], or NaN when _nan_stats found no position"""
+    return np.nan if i is None else arr[i]
+
+
+def _month_label(months: pd.DatetimeIndex, i) -> str:
+    """' (Month Year)' for position i, or nothing when _nan_stats found no position"""
+    return '' if i is None else f" ({months[i].strftime('%B %Y')})"
 
 # Set style for better-looking plots
 plt.style.use('seaborn-v0_8-darkgrid')
@@ -27,164 +87,119 @@ class EGaugeDataCollector:
     def __init__(self, ip_address: str):
         self.ip = ip_address
         self.base_url = f"http://{ip_address}"
-
-    def fetch_monthly_data(self) -> pd.DataFrame:
-        """Fetch monthly data for the past year"""
-        print("Fetching monthly data for the past year...")
-        url = f"{self.base_url}/cgi-bin/egauge-show?m&n=12"
+        # One keep-alive session for every request to the device
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS))
+
+    def _iter_groups(self, xml_stream):
+        """Stream-parse egauge-show XML, yielding (epoch seconds, {cname: value}) per group"""
+        # Bind the compiled queries locally for the per-group loop
+        ts_xpath, data_xpath = _TS_XPATH, _DATA_XPATH
+        cname_xpath, col_text_xpath = _CNAME_XPATH, _COL_TEXT_XPATH
+
+        for _, group in ET.iterparse(xml_stream, events=('end',), tag='group'):
+            ts_text = ts_xpath(group)
+            if ts_text:
+                values = {}
+                for data in data_xpath(group):
+                    cname = cname_xpath(data)
+                    if cname and cname[0]:
+                        # The last column that parses as a number wins; scanning
+                        # from the end usually settles on the first try
+                        for text in reversed(col_text_xpath(data)):
+                            try:
+                                values[cname[0]] = float(text)
+                                break
+                            except ValueError:
+                                pass
+                yield int(ts_text[0]), values
+
+            # Release the parsed group and its processed siblings
+            group.clear(keep_tail=True)
+            while group.getprevious() is not None:
+                del group.getparent()[0]
+
+    def _fetch(self, period: str, count: int, divisor: float, label: str) -> pd.DataFrame:
+        """Fetch count egauge-show rows for a period into a column-oriented, time-sorted DataFrame"""
+        url = f"{self.base_url}/cgi-bin/egauge-show?{period}&n={count}"
 
         try:
-            response = requests.get(url, timeout=10)
-            root = ET.fromstring(response.content)
-
-            data_points = []
-            for group in root.findall('.//group'):
-                timestamp_elem = group.find('timestamp')
-                if timestamp_elem is not None:
-                    ts = int(timestamp_elem.text)
-                    dt = datetime.fromtimestamp(ts)
-
-                    row_data = {'timestamp': dt}
-
-                    for data in group.findall('data'):
-                        cname = data.find('cname').text if data.find('cname') is not None else None
-                        if cname:
-                            columns = data.findall('.//column')
-                            if columns:
-                                # Get the delta value (monthly change)
-                                for col in columns:
-                                    if col.text:
-                                        try:
-                                            value = float(col.text) / 1000.0  # Convert to kWh
-                                            row_data[cname] = value
-                                        except:
-                                            pass
-
-                    if row_data:
-                        data_points.append(row_data)
-
-            if data_points:
-                df = pd.DataFrame(data_points)
-                df = df.set_index('timestamp')
-                df = df.sort_index()
-                print(f"Fetched {len(df)} monthly data points")
+            # One preallocated array per register, filled by group position;
+            # registers missing from a group stay None (NaN after conversion)
+            capacity = max(count, 1)
+            timestamps = np.empty(capacity, dtype=np.int64)
+            cols = {}
+            cols_get = cols.get
+            n = 0
+            with self.session.get(url, timeout=10, stream=True) as response:
+                response.raw.decode_content = True
+                for ts, values in self._iter_groups(response.raw):
+                    if n == capacity:
+                        # More groups than requested; double the arrays
+                        timestamps = np.concatenate([timestamps, np.empty(capacity, dtype=np.int64)])
+                        for cname, col in cols.items():
+                            cols[cname] = np.concatenate([col, np.full(capacity, None, dtype=object)])
+                        capacity *= 2
+
+                    timestamps[n] = ts
+                    for cname, value in values.items():
+                        col = cols_get(cname)
+                        if col is None:
+                            col = cols[cname] = np.full(capacity, None, dtype=object)
+                        col[n] = value
+                    n += 1
+
+            if n:
+                # Convert each register in one vectorized pass; missing readings become NaN
+                scale = 1.0 / divisor
+                data = {cname: pd.to_numeric(col[:n], errors='coerce').astype(np.float64) * scale
+                        for cname, col in cols.items()}
+                df = pd.DataFrame(data, index=to_local_index(timestamps[:n]))
+                df.index.name = 'timestamp'
+                df.sort_index(inplace=True)
+                print(f"Fetched {len(df)} {label} data points")
                 return df
 
         except Exception as e:
-            print(f"Error fetching monthly data: {e}")
+            print(f"Error fetching {label} data: {e}")
 
         return pd.DataFrame()
 
+    def fetch_monthly_data(self) -> pd.DataFrame:
+        """Fetch monthly data for the past year"""
+        print("Fetching monthly data for the past year...")
+        return self._fetch("m", 12, 1000.0, "monthly")  # Convert to kWh
+
     def fetch_daily_data(self, days: int = 30) -> pd.DataFrame:
         """Fetch daily data"""
         print(f"Fetching {days} days of daily data...")
-        url = f"{self.base_url}/cgi-bin/egauge-show?d&n={days}"
-
-        try:
-            response = requests.get(url, timeout=10)
-            root = ET.fromstring(response.content)
-
-            data_points = []
-            for group in root.findall('.//group'):
-                timestamp_elem = group.find('timestamp')
-                if timestamp_elem is not None:
-                    ts = int(timestamp_elem.text)
-                    dt = datetime.fromtimestamp(ts)
-
-                    row_data = {'timestamp': dt}
-
-                    for data in group.findall('data'):
-                        cname = data.find('cname').text if data.find('cname') is not None else None
-                        if cname:
-                            columns = data.findall('.//column')
-                            if columns:
-                                for col in columns:
-                                    if col.text:
-                                        try:
-                                            value = float(col.text) / 1000.0  # Convert to kWh
-                                            row_data[cname] = value
-                                        except:
-                                            pass
-
-                    if row_data:
-                        data_points.append(row_data)
-
-            if data_points:
-                df = pd.DataFrame(data_points)
-                df = df.set_index('timestamp')
-                df = df.sort_index()
-                print(f"Fetched {len(df)} daily data points")
-                return df
-
-        except Exception as e:
-            print(f"Error fetching daily data: {e}")
-
-        return pd.DataFrame()
+        return self._fetch("d", days, 1000.0, "daily")  # Convert to kWh
 
     def fetch_hourly_data(self, hours: int = 168) -> pd.DataFrame:
         """Fetch hourly data (default: 1 week)"""
         print(f"Fetching {hours} hours of hourly data...")
-        url = f"{self.base_url}/cgi-bin/egauge-show?h&n={hours}"
+        df = self._fetch("h", hours, 1.0, "hourly")  # Keep in Wh for hourly
 
-        try:
-            response = requests.get(url, timeout=10)
-            root = ET.fromstring(response.content)
-
-            data_points = []
-            for group in root.findall('.//group'):
-                timestamp_elem = group.find('timestamp')
-                if timestamp_elem is not None:
-                    ts = int(timestamp_elem.text)
-                    dt = datetime.fromtimestamp(ts)
-
-                    row_data = {'timestamp': dt}
-
-                    for data in group.findall('data'):
-                        cname = data.find('cname').text if data.find('cname') is not None else None
-                        if cname:
-                            columns = data.findall('.//column')
-                            if columns:
-                                for col in columns:
-                                    if col.text:
-                                        try:
-                                            value = float(col.text)  # Keep in Wh for hourly
-                                            row_data[cname] = value
-                                        except:
-                                            pass
-
-                    if row_data:
-                        data_points.append(row_data)
-
-            if data_points:
-                df = pd.DataFrame(data_points)
-                df = df.set_index('timestamp')
-                df = df.sort_index()
-
-                # Calculate hourly changes (delta values)
-                for col in df.columns:
-                    df[f'{col}_delta'] = df[col].diff()
-
-                print(f"Fetched {len(df)} hourly data points")
-                return df
+        # Calculate hourly changes (delta values) in one frame-wide diff
+        delta = df.diff()
+        delta.columns = [f'{col}_delta' for col in df.columns]
+        df = pd.concat([df, delta], axis=1)
 
-        except Exception as e:
-            print(f"Error fetching hourly data: {e}")
-
-        return pd.DataFrame()
+        return df
 
     def get_current_readings(self) -> dict:
         """Get current power readings"""
         url = f"{self.base_url}/cgi-bin/egauge?inst"
         try:
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             if response.status_code == 200:
                 root = ET.fromstring(response.content)
                 readings = {}
-                for reg in root.findall('.//r'):
+                for reg in _REG_XPATH(root):
                     name = reg.get('n')
-                    power_element = reg.find('i')
-                    if power_element is not None:
-                        power = float(power_element.text) / 1000.0  # Convert to kW
+                    power_text = _INST_XPATH(reg)
+                    if power_text:
+                        power = float(power_text[0]) / 1000.0  # Convert to kW
                         readings[name] = power
                 return readings
         except Exception as e:
@@ -202,20 +217,19 @@ class EGaugeAnalyzer:
         print("eGAUGE COMPREHENSIVE POWER ANALYSIS")
         print("="*60)
 
-        # Get current readings
-        current = self.collector.get_current_readings()
-        if current:
-            print("\nCURRENT POWER READINGS:")
-            print("-"*40)
-            print(f"Grid Power: {current.get('Grid', 0):.2f} kW")
-            print(f"Solar Production: {current.get('Solar', 0):.2f} kW")
-            print(f"Grid Export: {current.get('Grid_Outgoing', 0):.2f} kW")
-            print(f"Grid Import: {current.get('Grid_Incoming', 0):.2f} kW")
+        # Fetch the current readings and all data types concurrently
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            current_future = executor.submit(self.collector.get_current_readings)
+            monthly_future = executor.submit(self.collector.fetch_monthly_data)
+            daily_future = executor.submit(self.collector.fetch_daily_data, 365)  # Get full year of daily data
+            hourly_future = executor.submit(self.collector.fetch_hourly_data, 24*7)  # Get 1 week of hourly data
+
+            monthly_df = monthly_future.result()
+            daily_df = daily_future.result()
+            hourly_df = hourly_future.result()
+            current = current_future.result()
 
-        # Fetch all data types
-        monthly_df = self.collector.fetch_monthly_data()
-        daily_df = self.collector.fetch_daily_data(365)  # Get full year of daily data
-        hourly_df = self.collector.fetch_hourly_data(24*7)  # Get 1 week of hourly data
+        self._print_current(current)
 
         # Create visualizations
         self.create_comprehensive_plots(monthly_df, daily_df, hourly_df, current)
@@ -223,27 +237,43 @@ class EGaugeAnalyzer:
         # Generate report
         self.generate_detailed_report(monthly_df, daily_df, hourly_df)
 
+    def _print_current(self, current: dict):
+        """Print the current power readings"""
+        if current:
+            print("\nCURRENT POWER READINGS:")
+            print("-"*40)
+            print(f"Grid Power: {current.get('Grid', 0):.2f} kW")
+            print(f"Solar Production: {current.get('Solar', 0):.2f} kW")
+            print(f"Grid Export: {current.get('Grid_Outgoing', 0):.2f} kW")
+            print(f"Grid Import: {current.get('Grid_Incoming', 0):.2f} kW")
+
     def create_comprehensive_plots(self, monthly_df, daily_df, hourly_df, current):
         """Create comprehensive visualization dashboard"""
-        fig = plt.figure(figsize=(24, 20))
+        fig = plt.figure(figsize=(24, 20), layout='constrained')
         fig.suptitle('eGauge Power Monitor Analysis Dashboard', fontsize=18, fontweight='bold')
 
+        # Build the whole 4x3 grid in one call
+        axes = fig.subplots(4, 3).ravel()
+        ax1, ax2, ax3, ax4, ax5, ax6, ax7, ax8, ax9, ax10, ax11, ax12 = axes
+
+        # Absolute register values, computed once and shared by the panels;
+        # None when the register is missing, so its panels are skipped
+        m_grid = _col_abs(monthly_df, 'Grid')
+        m_solar = _col_abs(monthly_df, 'Solar')
+        d_grid = _col_abs(daily_df, 'Grid')
+        d_solar = _col_abs(daily_df, 'Solar')
+
         # 1. Monthly Energy Balance
-        ax1 = plt.subplot(4, 3, 1)
-        if not monthly_df.empty:
+        if m_grid is not None or m_solar is not None:
             months = monthly_df.index.strftime('%b\n%Y')
 
-            # Calculate monthly deltas (changes)
-            grid_import = monthly_df.get('Grid', pd.Series()).abs()
-            solar_prod = monthly_df.get('Solar', pd.Series()).abs()
-
             x = np.arange(len(months))
             width = 0.35
 
-            if not grid_import.empty:
-                ax1.bar(x - width/2, grid_import, width, label='Grid Import', color='#FF6B6B', alpha=0.8)
-            if not solar_prod.empty:
-                ax1.bar(x + width/2, solar_prod, width, label='Solar Production', color='#51CF66', alpha=0.8)
+            if m_grid is not None:
+                ax1.bar(x - width/2, m_grid, width, label='Grid Import', color='#FF6B6B', alpha=0.8)
+            if m_solar is not None:
+                ax1.bar(x + width/2, m_solar, width, label='Solar Production', color='#51CF66', alpha=0.8)
 
             ax1.set_xlabel('Month')
             ax1.set_ylabel('Energy (kWh)')
@@ -254,14 +284,13 @@ class EGaugeAnalyzer:
             ax1.grid(True, alpha=0.3)
 
         # 2. Daily Pattern for Last 30 Days
-        ax2 = plt.subplot(4, 3, 2)
-        if not daily_df.empty and len(daily_df) > 0:
-            recent_daily = daily_df.tail(30)
-            if 'Grid' in recent_daily.columns:
-                ax2.bar(recent_daily.index, recent_daily['Grid'].abs(),
+        if d_grid is not None or d_solar is not None:
+            recent_index = daily_df.index[-30:]
+            if d_grid is not None:
+                ax2.bar(recent_index, d_grid[-30:],
                        color='#FF6B6B', alpha=0.6, label='Grid')
-            if 'Solar' in recent_daily.columns:
-                ax2.bar(recent_daily.index, -recent_daily['Solar'].abs(),
+            if d_solar is not None:
+                ax2.bar(recent_index, -d_solar[-30:],
                        color='#51CF66', alpha=0.6, label='Solar')
 
             ax2.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
@@ -273,16 +302,14 @@ class EGaugeAnalyzer:
             plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45, ha='right')
 
         # 3. Hourly Pattern Analysis
-        ax3 = plt.subplot(4, 3, 3)
         if not hourly_df.empty:
-            # Group by hour of day
-            hourly_df['hour'] = hourly_df.index.hour
-
             # Use delta columns if available
             grid_col = 'Grid_delta' if 'Grid_delta' in hourly_df.columns else 'Grid'
             solar_col = 'Solar_delta' if 'Solar_delta' in hourly_df.columns else 'Solar'
 
-            hourly_avg = hourly_df.groupby('hour').mean()
+            # Group by hour of day, averaging only the plotted columns
+            plot_cols = [c for c in (grid_col, solar_col) if c in hourly_df.columns]
+            hourly_avg = hourly_df[plot_cols].groupby(hourly_df.index.hour).mean()
 
             if grid_col in hourly_avg.columns:
                 ax3.plot(hourly_avg.index, hourly_avg[grid_col].abs()/1000,
@@ -299,12 +326,11 @@ class EGaugeAnalyzer:
             ax3.grid(True, alpha=0.3)
 
         # 4. Year Overview - Daily
-        ax4 = plt.subplot(4, 3, 4)
         if not daily_df.empty and len(daily_df) > 30:
-            if 'Grid' in daily_df.columns and 'Solar' in daily_df.columns:
-                ax4.fill_between(daily_df.index, daily_df['Solar'].abs(),
+            if d_grid is not None and d_solar is not None:
+                ax4.fill_between(daily_df.index, d_solar,
                                 alpha=0.5, label='Solar', color='#51CF66')
-                ax4.fill_between(daily_df.index, -daily_df['Grid'].abs(),
+                ax4.fill_between(daily_df.index, -d_grid,
                                 alpha=0.5, label='Grid', color='#FF6B6B')
                 ax4.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
                 ax4.set_xlabel('Date')
@@ -314,12 +340,11 @@ class EGaugeAnalyzer:
                 ax4.grid(True, alpha=0.3)
 
         # 5. Monthly Comparison Chart
-        ax5 = plt.subplot(4, 3, 5)
         if not monthly_df.empty and len(monthly_df) > 1:
             # Calculate net energy for each month
-            if 'Grid' in monthly_df.columns and 'Solar' in monthly_df.columns:
-                net_energy = monthly_df['Solar'].abs() - monthly_df['Grid'].abs()
-                colors = ['#51CF66' if x > 0 else '#FF6B6B' for x in net_energy]
+            if m_grid is not None and m_solar is not None:
+                net_energy = m_solar - m_grid
+                colors = np.where(net_energy > 0, '#51CF66', '#FF6B6B')
 
                 ax5.bar(monthly_df.index.strftime('%b'), net_energy, color=colors, alpha=0.7)
                 ax5.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
@@ -330,19 +355,25 @@ class EGaugeAnalyzer:
                 plt.setp(ax5.xaxis.get_majorticklabels(), rotation=45)
 
         # 6. Solar Production Efficiency
-        ax6 = plt.subplot(4, 3, 6)
-        if not daily_df.empty and 'Solar' in daily_df.columns:
-            # Group by month
-            daily_df['month'] = daily_df.index.month
-            monthly_solar = daily_df.groupby('month')['Solar'].agg(['mean', 'max', 'min']).abs()
+        if d_solar is not None:
+            # Per-month mean/max/min in one reduceat pass over month-sorted days
+            month = daily_df.index.month.to_numpy()
+            order = np.argsort(month, kind='stable')
+            solar = daily_df['Solar'].to_numpy()[order]
+            x, starts = np.unique(month[order], return_index=True)
+            finite = np.isfinite(solar)
+            with np.errstate(invalid='ignore'):
+                solar_mean = np.abs(np.add.reduceat(np.where(finite, solar, 0.0), starts)
+                                    / np.add.reduceat(finite.astype(np.int64), starts))
+            solar_max = np.abs(np.fmax.reduceat(solar, starts))
+            solar_min = np.abs(np.fmin.reduceat(solar, starts))
 
             months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
                      'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 
-            x = list(monthly_solar.index)
-            ax6.fill_between(x, monthly_solar['min'], monthly_solar['max'],
+            ax6.fill_between(x, solar_min, solar_max,
                             alpha=0.3, color='#51CF66', label='Min-Max Range')
-            ax6.plot(x, monthly_solar['mean'], marker='o', linewidth=2,
+            ax6.plot(x, solar_mean, marker='o', linewidth=2,
                     color='#2E8B57', label='Average')
 
             ax6.set_xlabel('Month')
@@ -354,16 +385,17 @@ class EGaugeAnalyzer:
             ax6.grid(True, alpha=0.3)
 
         # 7. Weekly Pattern Heatmap
-        ax7 = plt.subplot(4, 3, 7)
         if not hourly_df.empty and len(hourly_df) > 24:
-            hourly_df['hour'] = hourly_df.index.hour
-            hourly_df['day'] = hourly_df.index.dayofweek
-
             grid_col = 'Grid_delta' if 'Grid_delta' in hourly_df.columns else 'Grid'
             if grid_col in hourly_df.columns:
-                pivot = hourly_df.pivot_table(values=grid_col, index='day',
-                                             columns='hour', aggfunc='mean')
-                pivot = pivot.abs() / 1000  # Convert to kW
+                # Mean per (day, hour) cell via bincount; empty cells stay NaN
+                vals = hourly_df[grid_col].to_numpy()
+                cell = hourly_df.index.dayofweek.to_numpy() * 24 + hourly_df.index.hour.to_numpy()
+                finite = np.isfinite(vals)
+                sums = np.bincount(cell[finite], weights=vals[finite], minlength=7*24)
+                counts = np.bincount(cell[finite], minlength=7*24)
+                with np.errstate(invalid='ignore'):
+                    pivot = np.abs(sums / counts).reshape(7, 24) / 1000  # Convert to kW
 
                 sns.heatmap(pivot, cmap='YlOrRd', ax=ax7,
                           cbar_kws={'label': 'Grid Usage (kW)'})
@@ -373,18 +405,17 @@ class EGaugeAnalyzer:
                 ax7.set_title('Weekly Grid Usage Pattern', fontweight='bold')
 
         # 8. Cost Analysis
-        ax8 = plt.subplot(4, 3, 8)
         if not monthly_df.empty:
             # Estimate costs (adjust rates as needed)
             import_rate = 0.15  # $/kWh
             export_rate = 0.08  # $/kWh
 
-            if 'Grid' in monthly_df.columns:
-                import_cost = monthly_df['Grid'].abs() * import_rate
+            if m_grid is not None:
+                import_cost = m_grid * import_rate
 
                 # Estimate export from solar excess
-                if 'Solar' in monthly_df.columns:
-                    export_revenue = (monthly_df['Solar'].abs() * 0.3) * export_rate  # Assume 30% export
+                if m_solar is not None:
+                    export_revenue = (m_solar * 0.3) * export_rate  # Assume 30% export
                     net_cost = import_cost - export_revenue
 
                     months = monthly_df.index.strftime('%b')
@@ -406,7 +437,6 @@ class EGaugeAnalyzer:
                     ax8.grid(True, alpha=0.3)
 
         # 9. Current Status Gauge
-        ax9 = plt.subplot(4, 3, 9)
         if current:
             # Create a simple gauge visualization
             grid_power = current.get('Grid', 0)
@@ -428,11 +458,9 @@ class EGaugeAnalyzer:
             ax9.grid(True, alpha=0.3, axis='x')
 
         # 10. Peak Demand Analysis
-        ax10 = plt.subplot(4, 3, 10)
-        if not daily_df.empty and 'Grid' in daily_df.columns:
+        if d_grid is not None:
             # Group by month and find peak days
-            daily_df['month'] = daily_df.index.to_period('M')
-            monthly_peaks = daily_df.groupby('month')['Grid'].max().abs()
+            monthly_peaks = daily_df['Grid'].groupby(daily_df.index.to_period('M')).max().abs()
 
             if len(monthly_peaks) > 0:
                 ax10.bar(range(len(monthly_peaks)), monthly_peaks.values,
@@ -445,19 +473,18 @@ class EGaugeAnalyzer:
                 ax10.grid(True, alpha=0.3)
 
         # 11. Solar vs Grid Correlation
-        ax11 = plt.subplot(4, 3, 11)
-        if not daily_df.empty and 'Grid' in daily_df.columns and 'Solar' in daily_df.columns:
+        if d_grid is not None and d_solar is not None:
             # Scatter plot of solar vs grid
-            ax11.scatter(daily_df['Solar'].abs(), daily_df['Grid'].abs(),
+            ax11.scatter(d_solar, d_grid,
                         alpha=0.5, s=20, color='#8B4789')
 
-            # Add trend line
-            z = np.polyfit(daily_df['Solar'].abs().fillna(0),
-                          daily_df['Grid'].abs().fillna(0), 1)
-            p = np.poly1d(z)
-            x_trend = np.linspace(daily_df['Solar'].abs().min(),
-                                 daily_df['Solar'].abs().max(), 100)
-            ax11.plot(x_trend, p(x_trend), "r--", alpha=0.8, label='Trend')
+            # Add trend line, fitted only on days with both readings
+            paired = np.isfinite(d_solar) & np.isfinite(d_grid)
+            if paired.sum() >= 2:
+                x_fit, y_fit = d_solar[paired], d_grid[paired]
+                slope, intercept = np.polyfit(x_fit, y_fit, 1)
+                x_trend = np.linspace(x_fit.min(), x_fit.max(), 100)
+                ax11.plot(x_trend, slope * x_trend + intercept, "r--", alpha=0.8, label='Trend')
 
             ax11.set_xlabel('Solar Production (kWh/day)')
             ax11.set_ylabel('Grid Import (kWh/day)')
@@ -466,37 +493,36 @@ class EGaugeAnalyzer:
             ax11.grid(True, alpha=0.3)
 
         # 12. Summary Statistics Box
-        ax12 = plt.subplot(4, 3, 12)
         ax12.axis('off')
 
         # Calculate summary statistics
         summary_text = "SUMMARY STATISTICS\n" + "="*30 + "\n\n"
 
         if not monthly_df.empty:
-            if 'Grid' in monthly_df.columns:
-                total_grid = monthly_df['Grid'].abs().sum()
-                avg_grid = monthly_df['Grid'].abs().mean()
+            if m_grid is not None:
+                total_grid = np.nansum(m_grid)
+                avg_grid = np.nanmean(m_grid)
                 summary_text += f"Total Grid Import: {total_grid:,.0f} kWh\n"
                 summary_text += f"Avg Monthly Grid: {avg_grid:,.0f} kWh\n\n"
 
-            if 'Solar' in monthly_df.columns:
-                total_solar = monthly_df['Solar'].abs().sum()
-                avg_solar = monthly_df['Solar'].abs().mean()
+            if m_solar is not None:
+                total_solar = np.nansum(m_solar)
+                avg_solar = np.nanmean(m_solar)
                 summary_text += f"Total Solar Prod: {total_solar:,.0f} kWh\n"
                 summary_text += f"Avg Monthly Solar: {avg_solar:,.0f} kWh\n\n"
 
         if not daily_df.empty:
-            if 'Grid' in daily_df.columns:
-                peak_day = daily_df['Grid'].abs().max()
-                avg_daily = daily_df['Grid'].abs().mean()
+            if d_grid is not None:
+                peak_day = np.nanmax(d_grid)
+                avg_daily = np.nanmean(d_grid)
                 summary_text += f"Peak Day Demand: {peak_day:,.0f} kWh\n"
                 summary_text += f"Avg Daily Demand: {avg_daily:,.0f} kWh\n\n"
 
         # Add cost estimates
-        if not monthly_df.empty and 'Grid' in monthly_df.columns:
-            annual_cost = monthly_df['Grid'].abs().sum() * 0.15
-            if 'Solar' in monthly_df.columns:
-                annual_savings = monthly_df['Solar'].abs().sum() * 0.15
+        if m_grid is not None:
+            annual_cost = np.nansum(m_grid) * 0.15
+            if m_solar is not None:
+                annual_savings = np.nansum(m_solar) * 0.15
                 summary_text += f"Est Annual Cost: ${annual_cost:,.0f}\n"
                 summary_text += f"Est Solar Savings: ${annual_savings:,.0f}\n"
                 summary_text += f"Net Savings: ${(annual_savings-annual_cost):,.0f}\n"
@@ -506,14 +532,20 @@ class EGaugeAnalyzer:
                  fontfamily='monospace',
                  bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
 
-        plt.tight_layout()
+        # Hide chart panels that had no data to draw
+        for ax in axes[:-1]:
+            if not ax.has_data():
+                ax.set_visible(False)
 
         # Save the figure
         filename = f'egauge_analysis_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png'
-        plt.savefig(filename, dpi=150, bbox_inches='tight')
+        plt.savefig(filename, dpi=100, bbox_inches='tight')
         print(f"\nVisualizations saved to {filename}")
 
-        plt.show()
+        if INTERACTIVE:
+            plt.show()
+        else:
+            plt.close(fig)
 
     def generate_detailed_report(self, monthly_df, daily_df, hourly_df):
         """Generate detailed text report"""
@@ -521,63 +553,69 @@ class EGaugeAnalyzer:
         print("DETAILED ANALYSIS REPORT")
         print("="*60)
 
+        m_grid = _col_abs(monthly_df, 'Grid')
+        m_solar = _col_abs(monthly_df, 'Solar')
+        d_grid = _col_abs(daily_df, 'Grid')
+        d_solar = _col_abs(daily_df, 'Solar')
+
         # Monthly Analysis
         if not monthly_df.empty:
             print("\nMONTHLY ANALYSIS")
             print("-"*40)
+            months = monthly_df.index
 
-            if 'Grid' in monthly_df.columns:
-                grid_data = monthly_df['Grid'].abs()
+            if m_grid is not None:
+                total, mean, i_max, i_min = _nan_stats(m_grid)
                 print(f"Grid Import Statistics:")
-                print(f"  Total: {grid_data.sum():,.0f} kWh")
-                print(f"  Monthly Average: {grid_data.mean():,.0f} kWh")
-                print(f"  Peak Month: {grid_data.max():,.0f} kWh ({grid_data.idxmax().strftime('%B %Y')})")
-                print(f"  Lowest Month: {grid_data.min():,.0f} kWh ({grid_data.idxmin().strftime('%B %Y')})")
+                print(f"  Total: {total:,.0f} kWh")
+                print(f"  Monthly Average: {mean:,.0f} kWh")
+                print(f"  Peak Month: {_value_at(m_grid, i_max):,.0f} kWh{_month_label(months, i_max)}")
+                print(f"  Lowest Month: {_value_at(m_grid, i_min):,.0f} kWh{_month_label(months, i_min)}")
 
-            if 'Solar' in monthly_df.columns:
-                solar_data = monthly_df['Solar'].abs()
+            if m_solar is not None:
+                total, mean, i_max, i_min = _nan_stats(m_solar)
                 print(f"\nSolar Production Statistics:")
-                print(f"  Total: {solar_data.sum():,.0f} kWh")
-                print(f"  Monthly Average: {solar_data.mean():,.0f} kWh")
-                print(f"  Peak Month: {solar_data.max():,.0f} kWh ({solar_data.idxmax().strftime('%B %Y')})")
-                print(f"  Lowest Month: {solar_data.min():,.0f} kWh ({solar_data.idxmin().strftime('%B %Y')})")
+                print(f"  Total: {total:,.0f} kWh")
+                print(f"  Monthly Average: {mean:,.0f} kWh")
+                print(f"  Peak Month: {_value_at(m_solar, i_max):,.0f} kWh{_month_label(months, i_max)}")
+                print(f"  Lowest Month: {_value_at(m_solar, i_min):,.0f} kWh{_month_label(months, i_min)}")
 
         # Daily Analysis
         if not daily_df.empty:
             print("\nDAILY PATTERNS")
             print("-"*40)
 
-            if 'Grid' in daily_df.columns:
-                grid_daily = daily_df['Grid'].abs()
+            if d_grid is not None:
+                _, mean, i_max, i_min = _nan_stats(d_grid)
                 print(f"Daily Grid Usage:")
-                print(f"  Average: {grid_daily.mean():,.1f} kWh/day")
-                print(f"  Peak Day: {grid_daily.max():,.1f} kWh")
-                print(f"  Minimum Day: {grid_daily.min():,.1f} kWh")
+                print(f"  Average: {mean:,.1f} kWh/day")
+                print(f"  Peak Day: {_value_at(d_grid, i_max):,.1f} kWh")
+                print(f"  Minimum Day: {_value_at(d_grid, i_min):,.1f} kWh")
 
-            if 'Solar' in daily_df.columns:
-                solar_daily = daily_df['Solar'].abs()
+            if d_solar is not None:
+                _, mean, i_max, i_min = _nan_stats(d_solar)
                 print(f"\nDaily Solar Production:")
-                print(f"  Average: {solar_daily.mean():,.1f} kWh/day")
-                print(f"  Peak Day: {solar_daily.max():,.1f} kWh")
-                print(f"  Minimum Day: {solar_daily.min():,.1f} kWh")
+                print(f"  Average: {mean:,.1f} kWh/day")
+                print(f"  Peak Day: {_value_at(d_solar, i_max):,.1f} kWh")
+                print(f"  Minimum Day: {_value_at(d_solar, i_min):,.1f} kWh")
 
         # Hourly Analysis
         if not hourly_df.empty:
             print("\nHOURLY PATTERNS")
             print("-"*40)
 
-            hourly_df['hour'] = hourly_df.index.hour
+            hour = hourly_df.index.hour
             grid_col = 'Grid_delta' if 'Grid_delta' in hourly_df.columns else 'Grid'
             solar_col = 'Solar_delta' if 'Solar_delta' in hourly_df.columns else 'Solar'
 
             if grid_col in hourly_df.columns:
-                hourly_grid = hourly_df.groupby('hour')[grid_col].mean().abs() / 1000  # Convert to kW
+                hourly_grid = hourly_df[grid_col].groupby(hour).mean().abs() / 1000  # Convert to kW
                 peak_hour = hourly_grid.idxmax()
                 print(f"Peak Grid Usage Hour: {peak_hour}:00 ({hourly_grid[peak_hour]:.2f} kW average)")
                 print(f"Lowest Usage Hour: {hourly_grid.idxmin()}:00 ({hourly_grid.min():.2f} kW average)")
 
             if solar_col in hourly_df.columns:
-                hourly_solar = hourly_df.groupby('hour')[solar_col].mean().abs() / 1000
+                hourly_solar = hourly_df[solar_col].groupby(hour).mean().abs() / 1000
                 peak_solar = hourly_solar.idxmax()
                 print(f"\nPeak Solar Hour: {peak_solar}:00 ({hourly_solar[peak_solar]:.2f} kW average)")
 
@@ -585,15 +623,15 @@ class EGaugeAnalyzer:
         print("\nFINANCIAL ANALYSIS (Estimated)")
         print("-"*40)
 
-        if not monthly_df.empty and 'Grid' in monthly_df.columns:
+        if m_grid is not None:
             import_rate = 0.15  # $/kWh
-            total_grid = monthly_df['Grid'].abs().sum()
+            total_grid = np.nansum(m_grid)
             annual_grid_cost = total_grid * import_rate
 
             print(f"Annual Grid Import Cost: ${annual_grid_cost:,.2f}")
 
-            if 'Solar' in monthly_df.columns:
-                total_solar = monthly_df['Solar'].abs().sum()
+            if m_solar is not None:
+                total_solar = np.nansum(m_solar)
                 solar_value = total_solar * import_rate  # Value of solar at grid rate
                 export_rate = 0.08  # $/kWh for exports
                 export_revenue = total_solar * 0.3 * export_rate  # Assume 30% exported
@@ -3,38 +3,292 @@
 Quick test script to check eGauge data availability
 """
 
+import os
+import json
+import time
+import socket
+import hashlib
+import tempfile
+import threading
+import xml.sax
+import xml.sax.handler
+import io
+import sys
 import requests
-import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET  # Optional: lxml parses faster
+import numpy as np
+from datetime import datetime
 
 EGAUGE_IP = "10.10.20.241"
 
-def test_instant_data():
+def _compile_path(path):
+    """Compiled lxml XPath for path, or an equivalent findall under ElementTree"""
+    if hasattr(ET, 'XPath'):
+        return ET.XPath(path)
+    return lambda elem: elem.findall(path)
+
+# Register queries by reading tag (i: instantaneous, v: total), compiled once;
+# the predicates keep only registers with that reading
+_REG_QUERIES = {tag: _compile_path(f'.//r[{tag}]') for tag in ('i', 'v')}
+
+def _reg_readings(root, tag):
+    """Names and float64 array of readings for the registers with a tag value"""
+    regs = _REG_QUERIES[tag](root)
+    names = [reg.get('n') for reg in regs]
+    return names, np.array([reg.findtext(tag) for reg in regs], dtype=np.float64)
+
+# Connect should be near-instant on a LAN; fail fast on routing problems
+CONNECT_TIMEOUT = 1.0
+
+class _LowLatencyAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets also enable TCP keep-alive (urllib3 already sets TCP_NODELAY)"""
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+# One keep-alive session shared by every test request to the device
+SESSION = requests.Session()
+SESSION.headers["Connection"] = "keep-alive"
+# Ask for compressed XML; streamed bodies are decoded via raw.decode_content
+SESSION.headers["Accept-Encoding"] = "gzip, deflate"
+SESSION.mount("http://", _LowLatencyAdapter(pool_connections=1, pool_maxsize=4))
+
+class DeviceUnreachable(Exception):
+    """Raised instead of a request once the device has stopped answering"""
+
+# Circuit breaker: after this many consecutive connection failures every
+# further request is skipped instead of waiting out its own timeout. One is
+# enough on a LAN, and lets the concurrent historical probes skip as a batch
+FAIL_THRESHOLD = 1
+_fail_count = 0
+_fail_lock = threading.Lock()
+
+def _device_get(url, **kwargs):
+    """SESSION.get guarded by the connection-failure circuit breaker"""
+    global _fail_count
+    with _fail_lock:
+        tripped = _fail_count >= FAIL_THRESHOLD
+    if tripped:
+        raise DeviceUnreachable(url)
+    try:
+        response = SESSION.get(url, **kwargs)
+    except requests.ConnectionError:
+        # Includes ConnectTimeout; a read timeout means the device did answer,
+        # so it propagates without tripping the breaker
+        with _fail_lock:
+            _fail_count += 1
+        raise
+    with _fail_lock:
+        _fail_count = 0
+    return response
+
+# Recent instant/total responses are kept here so repeated runs skip the GET
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "egauge_test")
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temp file, so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+def _cached_get(url, ttl, timeout):
+    """GET and parse url as (status, root), reusing a cached copy younger than ttl seconds"""
+    key = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+    body_path = os.path.join(CACHE_DIR, key + ".xml")
+    meta_path = os.path.join(CACHE_DIR, key + ".json")
+
+    headers = {}
+    cached_root = None
+    try:
+        age = time.time() - os.path.getmtime(body_path)
+        cached_root = ET.parse(body_path).getroot()
+        if age < ttl:
+            return 200, cached_root
+
+        # Stale copy: revalidate it instead of downloading it again
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+    except (OSError, ValueError):
+        pass
+    except SyntaxError:
+        # Corrupt or truncated copy (lxml and ElementTree parse errors are
+        # both SyntaxErrors): drop it and fetch afresh unconditionally
+        cached_root = None
+
+    with _device_get(url, timeout=timeout, headers=headers, stream=True) as response:
+        # Conditional headers are only sent with a parsed cached body in hand
+        if response.status_code == 304 and cached_root is not None:
+            try:
+                os.utime(body_path)
+            except OSError:
+                pass
+            return 200, cached_root
+        if response.status_code != 200:
+            return response.status_code, None
+
+        # Parse while the body arrives, keeping the bytes for the cache
+        parser = ET.XMLParser()
+        chunks = []
+        for chunk in response.iter_content(chunk_size=16 * 1024):
+            parser.feed(chunk)
+            chunks.append(chunk)
+        root = parser.close()
+
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            _write_atomic(body_path, b''.join(chunks))
+            _write_atomic(meta_path, json.dumps({
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')}).encode())
+        except OSError:
+            pass  # Caching is best-effort
+    return 200, root
+
+def fetch_registers():
+    """Fetch instant and total readings together with one ?inst&tot request"""
+    url = f"http://{EGAUGE_IP}/cgi-bin/egauge?inst&tot"
+    try:
+        return _cached_get(url, ttl=5, timeout=(CONNECT_TIMEOUT, 5))
+    except (requests.ConnectionError, requests.Timeout, DeviceUnreachable) as e:
+        print(f"Error reaching device: {e}")
+        return None, None
+
+def test_instant_data(status, root):
     """Test instant data endpoint"""
     print("Testing instant data endpoint...")
-    url = f"http://{EGAUGE_IP}/cgi-bin/egauge?inst"
-    response = requests.get(url, timeout=5)
 
-    if response.status_code == 200:
-        root = ET.fromstring(response.content)
+    if status is None:
+        print("  Skipped - device unreachable")
+    elif status == 200:
         print("Current readings:")
-        for reg in root.findall('.//r'):
-            name = reg.get('n')
-            power_element = reg.find('i')
-            value_element = reg.find('v')
-            if power_element is not None:
-                power = float(power_element.text)
-                print(f"  {name}: {power:.1f} W ({power/1000:.2f} kW)")
+        names, power = _reg_readings(root, 'i')
+        # Scale all registers at once, then write the report in one call
+        kw = power / 1000
+        sys.stdout.write(''.join(f"  {name}: {w:.1f} W ({k:.2f} kW)\n"
+                                 for name, w, k in zip(names, power, kw)))
     else:
-        print(f"Error: {response.status_code}")
+        print(f"Error: {status}")
+
+class _CountingReader:
+    """File-like wrapper that counts the bytes read through it"""
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size)
+        self.count += len(chunk)
+        return chunk
+
+class _FormatFound(Exception):
+    """Raised by _FormatHandler to stop parsing once the format is settled"""
+
+class _FormatHandler(xml.sax.handler.ContentHandler):
+    """SAX handler tallying egauge-show format elements without building a tree"""
+    def __init__(self):
+        super().__init__()
+        self.groups = self.rows = self.cname_count = 0
+        self.cnames = []
+        self._text = None
+
+    def startElement(self, name, attrs):
+        if name == 'data':
+            # <data> wraps all the rows, so act on its opening tag
+            raise _FormatFound()
+        if name == 'cname':
+            self.cname_count += 1
+            if len(self.cnames) < 5:
+                self._text = []
+
+    def characters(self, content):
+        if self._text is not None:
+            self._text.append(content)
+
+    def endElement(self, name):
+        if name == 'group':
+            self.groups += 1
+        elif name == 'r':
+            self.rows += 1
+        elif name == 'cname' and self._text is not None:
+            self.cnames.append(''.join(self._text) or None)
+            self._text = None
+
+def _probe_historical(url):
+    """Stream one historical URL and return its report lines"""
+    lines = []
+    try:
+        with _device_get(url, timeout=(CONNECT_TIMEOUT, 10), stream=True) as response:
+            if response.status_code == 200:
+                response.raw.decode_content = True
+                body = _CountingReader(response.raw)
+
+                # One streaming SAX pass counts every format's elements; a
+                # <data> element settles the format, so parsing and download stop there
+                handler = _FormatHandler()
+                parser = xml.sax.make_parser()
+                parser.setContentHandler(handler)
+                has_data = False
+                try:
+                    for chunk in iter(lambda: body.read(16 * 1024), b''):
+                        parser.feed(chunk)
+                    parser.close()
+                except _FormatFound:
+                    has_data = True
+
+                if has_data and response.raw.length_remaining != 0:
+                    # Format settled with more still on the wire: abort the
+                    # transfer rather than downloading the rest
+                    response.close()
+                    size = f"{body.count}+ bytes (stopped after format detection)"
+                else:
+                    # Whatever is left is already received; count it
+                    while body.read(64 * 1024):
+                        pass
+                    size = f"{body.count} bytes"
+                lines.append(f"  Success! Response size: {size}")
+
+                # Check for data format
+                if has_data:
+                    lines.append("  Format: New JSON-like format")
+                elif handler.groups:
+                    lines.append("  Format: Old XML format")
+                    lines.append(f"  Found {handler.groups} data groups")
+                elif handler.cname_count:
+                    lines.append("  Format: Column format")
+                    lines.append(f"  Columns: {handler.cnames}")
+                    lines.append(f"  Data rows: {handler.rows}")
+            else:
+                lines.append(f"  Error: {response.status_code}")
+    except DeviceUnreachable:
+        lines.append("  Skipped - device unreachable")
+    except Exception as e:
+        lines.append(f"  Exception: {e}")
+    return lines
 
 def test_historical_data():
     """Test historical data endpoint"""
     print("\nTesting historical data endpoint...")
 
-    # Try to get last 24 hours of data
-    end_time = int(datetime.now().timestamp())
-    start_time = int((datetime.now() - timedelta(days=1)).timestamp())
+    # Try to get last 24 hours of data, both bounds from one clock sample
+    end_time = int(time.time())
+    start_time = end_time - 86400
 
     # Try different URL formats
     urls = [
@@ -43,52 +297,33 @@ def test_historical_data():
         f"http://{EGAUGE_IP}/cgi-bin/egauge-show?m&n=12",  # Last 12 months
     ]
 
-    for url in urls:
-        print(f"\nTrying: {url}")
-        try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                print(f"  Success! Response size: {len(response.content)} bytes")
-                # Parse first few entries
-                root = ET.fromstring(response.content)
+    # Probe all formats at once; report in order afterwards
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        reports = list(executor.map(_probe_historical, urls))
 
-                # Check for data format
-                if root.find('.//data'):
-                    print("  Format: New JSON-like format")
-                elif root.find('.//group'):
-                    print("  Format: Old XML format")
-                    groups = root.findall('.//group')
-                    print(f"  Found {len(groups)} data groups")
-                elif root.find('.//cname'):
-                    print("  Format: Column format")
-                    cnames = root.findall('.//cname')
-                    print(f"  Columns: {[c.text for c in cnames[:5]]}")
-                    rows = root.findall('.//r')
-                    print(f"  Data rows: {len(rows)}")
-            else:
-                print(f"  Error: {response.status_code}")
-        except Exception as e:
-            print(f"  Exception: {e}")
+    # Buffer the whole report and write it in one call
+    out = io.StringIO()
+    for url, lines in zip(urls, reports):
+        out.write(f"\nTrying: {url}\n")
+        for line in lines:
+            out.write(line + "\n")
+    sys.stdout.write(out.getvalue())
 
-def test_register_info():
+def test_register_info(status, root):
     """Test register information"""
     print("\nTesting register information...")
-    url = f"http://{EGAUGE_IP}/cgi-bin/egauge?tot"
 
     try:
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            root = ET.fromstring(response.content)
+        if status is None:
+            print("  Skipped - device unreachable")
+        elif status == 200:
             print("Total accumulated values:")
-            for reg in root.findall('.//r'):
-                name = reg.get('n')
-                value_element = reg.find('v')
-                if value_element is not None:
-                    value = float(value_element.text)
-                    # Convert from Wh to kWh
-                    kwh = value / 1000.0
-                    mwh = kwh / 1000.0
-                    print(f"  {name}: {kwh:.1f} kWh ({mwh:.2f} MWh)")
+            names, value = _reg_readings(root, 'v')
+            # Convert from Wh to kWh
+            kwh = value / 1000.0
+            mwh = kwh / 1000.0
+            sys.stdout.write(''.join(f"  {name}: {k:.1f} kWh ({m:.2f} MWh)\n"
+                                     for name, k, m in zip(names, kwh, mwh)))
     except Exception as e:
         print(f"Error: {e}")
 
@@ -100,8 +335,10 @@ if __name__ == "__main__":
     print(f"Current time: {datetime.now()}")
     print()
 
-    test_instant_data()
-    test_register_info()
+    # Instant and total readings share one request to the device
+    status, registers = fetch_registers()
+    test_instant_data(status, registers)
+    test_register_info(status, registers)
     test_historical_data()
 
     print("\n" + "="*60)